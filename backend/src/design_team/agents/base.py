@@ -1,20 +1,253 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import random
 import re
 import time
-from typing import Callable, Awaitable
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
 
+import orjson
 from google import genai
+from google.genai import errors as genai_errors
+
+from ..cache import PromptCache, get_prompt_cache
 
-from ..api.models import ActivityPayload, AgentUpdatePayload
+log = logging.getLogger(__name__)
 
 # Emit callback type: receives event-name + payload dict, puts it on the SSE queue
 EmitFn = Callable[[str, dict], None]
 
-import os
+# Milestone callback: (milestone_name, output_summary) -> Manager feedback string
+MilestoneFn = Callable[[str, str], Awaitable[str]]
 
 MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+DEFAULT_MAX_TOKENS = 8096
+
+# Outer markdown code fence around an LLM JSON response
+_FENCE_HEAD = re.compile(r"^```(?:json|JSON)?\s*")
+_FENCE_TAIL = re.compile(r"\s*```\s*$")
+
+# Identical prompts within this window reuse the first response
+LLM_CACHE_TTL_S = 600.0
+LLM_CACHE_MAXSIZE = 256
+
+# Run the current call belongs to (the session manager sets the thread_id).
+# Part of the dedup key: agents are shared by every session, and a new run of
+# the same brief must get a fresh design, not replay another run's responses
+llm_cache_scope: ContextVar[str] = ContextVar("llm_cache_scope", default="")
+
+# Observed output tokens per activity_prefix, used to calibrate max_tokens
+_TOKEN_PROFILE: dict[str, deque[int]] = defaultdict(lambda: deque(maxlen=64))
+_MIN_PROFILE_SAMPLES = 5
+
+# Cap on LLM streams in flight across the whole process. Agents are shared by
+# every session and provider rate limits are per API key, so past this point
+# extra concurrency only turns into 429s and backoff.
+LLM_CONCURRENCY = int(os.environ.get("DESIGN_STUDIO_LLM_CONCURRENCY", "16"))
+_LLM_SLOTS = asyncio.Semaphore(LLM_CONCURRENCY)
+
+# Minimum gap between "still thinking" activity pulses while streaming
+_PULSE_INTERVAL_NS = 1_500_000_000
+
+# Characters that can change JSON nesting depth or string state
+_JSON_STRUCT = re.compile(r'[{}\[\]"\\]')
+
+# Appended to the original request when call_llm_json re-asks for JSON
+_JSON_RETRY_SUFFIX = (
+    "\n\nYour previous reply could not be parsed as JSON. Reply with ONLY the "
+    "JSON object described above: no prose, no markdown."
+)
+# ...or, when the JSON parsed but its validator rejected it, for a corrected one
+_SCHEMA_RETRY_SUFFIX = (
+    "\n\nYour previous reply did not match the required shape:\n{problem}\n"
+    "Reply with ONLY the corrected JSON object described above: no prose, no markdown."
+)
+
+_T = TypeVar("_T")
+
+# 4xx codes that are still worth retrying (request timeout, rate limit)
+_RETRYABLE_CLIENT_CODES = {408, 429}
+
+
+def dump_scope_doc(scope_doc: dict) -> str:
+    """Serialize a scope doc for prompt injection (pretty-printed, UTF-8)."""
+    return orjson.dumps(scope_doc, option=orjson.OPT_INDENT_2, default=str).decode()
+
+
+def dump_within(items: list, budget: int) -> str:
+    """Compact JSON array of the leading items that fit in budget bytes.
+
+    Unlike slicing a full dump, each item is serialised once, items past the
+    budget are never serialised, and the result stays valid JSON. If even
+    the first item does not fit it is cut like preview_json, so the prompt
+    still gets something.
+    """
+    parts: list[bytes] = []
+    total = 2  # the brackets
+    for item in items:
+        data = orjson.dumps(item, default=str)
+        size = len(data) + (1 if parts else 0)  # comma separator
+        if total + size > budget:
+            break
+        parts.append(data)
+        total += size
+    if not parts and items:
+        return preview_json(items[:1], budget)
+    return (b"[" + b",".join(parts) + b"]").decode()
+
+
+def strip_fences(raw: str) -> str:
+    """Trim whitespace and the OUTER markdown code fence, if any."""
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = _FENCE_HEAD.sub("", raw, count=1)
+        raw = _FENCE_TAIL.sub("", raw, count=1)
+        raw = raw.strip()
+    return raw
+
+
+def scope_context(scope_json: str) -> str:
+    """The scope-document preamble passed as call_llm(context=...).
+
+    Kept byte-identical across an agent's calls so they share a cacheable prefix.
+    """
+    return f"SCOPE DOCUMENT:\n{scope_json}\n"
+
+
+def revision_section(notes: str) -> str:
+    """Fills a prompt template's {revision} slot: the human's revision
+    directive, or nothing, leaving a first-run prompt unchanged.
+    """
+    return f"\nREVISION DIRECTIVE FROM HUMAN (overrides earlier direction):\n{notes}\n" if notes else ""
+
+
+def dig(obj: object, *keys: str, default: object = None) -> object:
+    """Nested dict get that tolerates non-dict values along the path.
+
+    LLM output sometimes has a string or list where a dict is expected;
+    indexing those with a str key raises TypeError. The keys are usually
+    present, so EAFP beats a type check plus .get() per level.
+    """
+    try:
+        for key in keys:
+            obj = obj[key]  # type: ignore[index]
+    except (KeyError, TypeError):
+        return default
+    return obj
+
+
+def preview_json(obj: object, limit: int = 400) -> str:
+    """Short JSON preview of a (possibly huge) output dict for prompt summaries.
+
+    orjson serializes in C and the bytes are cut before decoding, so a
+    multi-KB output (e.g. a full HTML prototype) costs far less than str(obj).
+    """
+    return orjson.dumps(obj, default=str)[:limit].decode("utf-8", errors="ignore")
+
+
+def suggested_max_tokens(key: str, floor: int, ceiling: int) -> int:
+    """Output budget from observed usage: p95 × 1.2, clamped to [floor, ceiling].
+
+    Returns the ceiling until enough samples exist. Responses cut off at the
+    budget record the full budget, so the p95 drifts back up on truncation.
+    """
+    samples = _TOKEN_PROFILE.get(key)
+    if not samples or len(samples) < _MIN_PROFILE_SAMPLES:
+        return ceiling
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return min(ceiling, max(floor, int(p95 * 1.2)))
+
+
+async def gather_or_cancel(*aws: Awaitable) -> list:
+    """asyncio.gather that cancels the other awaitables once one fails.
+
+    Plain gather leaves the rest running, so a failed designer would let its
+    sibling keep streaming (and spending tokens) for a run that is already lost.
+    """
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+
+
+async def _drain_chunks(pipe: asyncio.Queue, on_chunk: Callable[[str], None]) -> None:
+    """Consumer side of call_llm's chunk pipeline; None marks end of stream."""
+    while (text := await pipe.get()) is not None:
+        on_chunk(text)
+
+
+async def _pipe_put(pipe: asyncio.Queue, consumer: asyncio.Task, item: str | None) -> None:
+    # A crashed consumer would never free queue space — surface its error instead
+    if consumer.done():
+        await consumer
+    await pipe.put(item)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Classify an LLM call failure as transient (retry) or permanent (fail fast).
+
+    Auth, bad-request and not-found errors will fail identically on every
+    attempt, so retrying them only burns time. Rate limits, 5xx and network
+    errors are transient.
+    """
+    if isinstance(exc, genai_errors.ClientError):
+        return exc.code in _RETRYABLE_CLIENT_CODES
+    return True
+
+
+class _OwnerCancelled(Exception):
+    """Set on a deduplicated call's future when the caller issuing it is
+    cancelled; waiters re-issue the call instead of inheriting the cancel."""
+
+
+class _JsonEndDetector:
+    """Bracket-depth counter over streamed text that spots where the first
+    top-level JSON value closes, so the stream can stop there instead of
+    waiting out any trailing commentary or fence."""
+
+    __slots__ = ("depth", "in_str", "escape")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_str = False
+        self.escape = False  # previous chunk ended on a backslash inside a string
+
+    def feed(self, text: str) -> int:
+        """Return the offset in text just past the closing bracket, or -1."""
+        pos = 0
+        if self.escape and text:
+            self.escape = False
+            pos = 1
+        while (m := _JSON_STRUCT.search(text, pos)) is not None:
+            c = m.group()
+            pos = m.end()
+            if self.in_str:
+                if c == "\\":
+                    if pos == len(text):
+                        self.escape = True
+                    pos += 1
+                elif c == '"':
+                    self.in_str = False
+            elif c == '"':
+                # Quotes in any prose before the value don't open a string
+                self.in_str = self.depth > 0
+            elif c in "{[":
+                self.depth += 1
+            elif self.depth and c in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos
+        return -1
 
 
 class BaseAgent:
@@ -24,47 +257,84 @@ class BaseAgent:
       - its own role index (maps to the frontend AGENTS array)
       - a Gemini client
       - helper methods: emit_activity(), emit_status(), call_llm()
+
+    Subclasses share call_llm's retry/caching/streaming machinery; only
+    _stream() talks to the Gemini client. Supporting another provider means
+    overriding _stream() and PROVIDER — no per-agent duplication.
     """
 
+    # Namespaces the disk cache so providers never share entries
+    PROVIDER = "gemini"
+
     def __init__(self, role_index: int, client: genai.Client) -> None:
         self.role_index = role_index
         self.client = client
+        # prompt hash → (expires_at, future resolving to the response text)
+        self._llm_cache: dict[bytes, tuple[float, asyncio.Future[str]]] = {}
 
     # ── JSON cleaning ───────────────────────────────────────────────────────
 
     @staticmethod
-    def clean_json(raw: str) -> str:
-        """Clean and repair LLM JSON responses; always returns a JSON object string.
+    def _load_json(raw: str) -> tuple[str, object]:
+        """Strip fences, repair if needed, and parse. Returns (json_text, parsed).
 
-        json-repair handles: trailing commas, unescaped chars, truncated JSON, etc.
-        We additionally unwrap any top-level JSON array — all our prompts ask for
-        a single object, so an array is always a wrapping mistake by the LLM.
+        Well-formed responses (the common case) are parsed once with orjson;
+        only malformed ones go through json-repair, which handles trailing
+        commas, unescaped chars, truncated JSON, etc. parsed is None when the
+        text could not be recovered.
         """
-        import json as _json
         from json_repair import repair_json  # type: ignore[import]
 
-        raw = raw.strip()
-
-        # Strip only the OUTER code fence using anchored patterns
-        if raw.startswith("```"):
-            raw = re.sub(r"^```(?:json|JSON)?\s*", "", raw)
-            raw = re.sub(r"\s*```\s*$", "", raw)
-            raw = raw.strip()
+        raw = strip_fences(raw)
 
+        # Fast path: already valid JSON — skip the pure-Python repair pass.
+        # Text not opening with { or [ cannot be a usable object, so don't try.
+        if raw[:1] in ("{", "["):
+            try:
+                return raw, orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass
         repaired = repair_json(raw, return_objects=False)
-
-        # Unwrap if the LLM wrapped the object in a JSON array: [{...}] → {...}
         try:
-            parsed = _json.loads(repaired)
-            if isinstance(parsed, list):
-                first = next((item for item in parsed if isinstance(item, dict)), None)
-                return _json.dumps(first if first is not None else {})
-        except Exception:
-            pass
+            return repaired, orjson.loads(repaired)
+        except orjson.JSONDecodeError:
+            return repaired, None
 
-        return repaired
+    @staticmethod
+    def _unwrap(parsed: object) -> object:
+        """Unwrap an LLM-wrapped object: [{...}] → {...}.
+
+        All our prompts ask for a single object, so a top-level array is
+        always a wrapping mistake by the LLM.
+        """
+        if isinstance(parsed, list):
+            first = next((item for item in parsed if isinstance(item, dict)), None)
+            return first if first is not None else {}
+        return parsed
+
+    @classmethod
+    def clean_json(cls, raw: str) -> str:
+        """Clean and repair LLM JSON responses; always returns a JSON object string."""
+        text, parsed = cls._load_json(raw)
+        if isinstance(parsed, list):
+            return orjson.dumps(cls._unwrap(parsed)).decode()
+        return text
+
+    @classmethod
+    def parse_json(cls, raw: str) -> dict | None:
+        """Clean, repair and parse an LLM JSON response in a single pass.
+
+        Returns the top-level object, or None if no object could be recovered.
+        Prefer this over json.loads(clean_json(raw)), which parses twice.
+        """
+        _, parsed = cls._load_json(raw)
+        parsed = cls._unwrap(parsed)
+        return parsed if isinstance(parsed, dict) else None
 
     # ── Emit helpers ────────────────────────────────────────────────────────
+    # Payloads are plain dicts shaped like ActivityPayload / AgentUpdatePayload
+    # (api/models.py). Inputs are our own literals, so per-emit Pydantic
+    # validation would only cost CPU.
 
     def emit_activity(
         self,
@@ -72,12 +342,11 @@ class BaseAgent:
         message: str,
         level: str = "info",
     ) -> None:
-        payload = ActivityPayload(
-            agentIndex=self.role_index,
-            message=message,
-            level=level,
-        )
-        emit("activity", payload.model_dump())
+        emit("activity", {
+            "agentIndex": self.role_index,
+            "message": message,
+            "level": level,
+        })
 
     def emit_status(
         self,
@@ -87,14 +356,13 @@ class BaseAgent:
         progress: float = 0.0,
         is_active: bool = True,
     ) -> None:
-        payload = AgentUpdatePayload(
-            agentIndex=self.role_index,
-            status=status,
-            currentTask=current_task,
-            progress=progress,
-            isActive=is_active,
-        )
-        emit("agent_update", payload.model_dump())
+        emit("agent_update", {
+            "agentIndex": self.role_index,
+            "status": status,
+            "currentTask": current_task,
+            "progress": progress,
+            "isActive": is_active,
+        })
 
     # ── LLM call ────────────────────────────────────────────────────────────
 
@@ -104,47 +372,321 @@ class BaseAgent:
         user: str,
         emit: EmitFn,
         activity_prefix: str = "Thinking",
-        max_tokens: int = 8096,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
         max_retries: int = 3,
         on_chunk: Callable[[str], None] | None = None,
+        base: float = 1.0,
+        cap: float = 30.0,
+        jitter: float = 0.5,
+        cache: bool = True,
+        chunk_coalesce_bytes: int = 4096,
+        min_tokens: int | None = None,
+        context: str = "",
+        stop_at_json_end: bool = False,
+        on_retry: Callable[[], None] | None = None,
+    ) -> str:
+        """Stream a Gemini response, deduplicating identical calls.
+
+        A call whose (system, user, max_tokens) matches one from the same run
+        (llm_cache_scope) already in flight or completed within LLM_CACHE_TTL_S
+        awaits/reuses that response instead of issuing a new request; on_chunk
+        then receives the full text at once.
+        With DESIGN_STUDIO_CACHE_DIR set, responses also persist across restarts.
+
+        When min_tokens is given, max_tokens is treated as a ceiling and the
+        actual budget is calibrated from past output sizes for this prefix.
+
+        context is an invariant preamble (e.g. the scope document) sent as a
+        content part ahead of user. Calls that share system + context share a
+        request prefix, which Gemini's implicit cache bills at a discount and
+        serves faster on every call after the first.
+
+        stop_at_json_end declares that the reply is a single JSON value: Gemini
+        is put in JSON output mode (no fences or trailing prose are generated),
+        and the stream is closed as soon as the top-level value is complete.
+
+        on_retry is called before a retry re-streams from the start, so an
+        on_chunk consumer can discard what it saw of the failed attempt.
+        """
+        # Both caches key on the caller's ceiling, not the calibrated budget,
+        # which drifts between calls (and call_llm_json can recompute the key)
+        ceiling = max_tokens
+        if min_tokens is not None:
+            max_tokens = suggested_max_tokens(activity_prefix, min_tokens, max_tokens)
+
+        if not cache:
+            return await self._stream_llm(
+                system, context, user, emit, activity_prefix, max_tokens, max_retries,
+                on_chunk=on_chunk, base=base, cap=cap, jitter=jitter,
+                chunk_coalesce_bytes=chunk_coalesce_bytes, stop_at_json_end=stop_at_json_end,
+                on_retry=on_retry,
+            )
+
+        key = self._llm_cache_key(system, context, user, ceiling)
+        now = time.monotonic()
+        entry = self._llm_cache.get(key)
+        if entry is not None and entry[0] > now:
+            try:
+                result = await asyncio.shield(entry[1])
+            except _OwnerCancelled:
+                # The owning call's abort is not ours: the entry is already
+                # evicted, so this call becomes (or joins) a fresh request
+                return await self.call_llm(
+                    system, user, emit, activity_prefix, max_tokens=ceiling,
+                    max_retries=max_retries, on_chunk=on_chunk, base=base, cap=cap,
+                    jitter=jitter, cache=cache, chunk_coalesce_bytes=chunk_coalesce_bytes,
+                    min_tokens=min_tokens, context=context, stop_at_json_end=stop_at_json_end,
+                    on_retry=on_retry,
+                )
+            log.debug("LLM:%s cache hit (%d chars)", activity_prefix, len(result))
+            if on_chunk and result:
+                on_chunk(result)
+            return result
+
+        fut: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._prune_llm_cache(now)
+        self._llm_cache[key] = (now + LLM_CACHE_TTL_S, fut)
+        disk = get_prompt_cache()
+        try:
+            result = None
+            if disk is not None:
+                disk_key = self._disk_cache_key(system, context, user, ceiling)
+                result = await asyncio.to_thread(disk.get, disk_key)
+            if result is not None:
+                log.debug("LLM:%s disk cache hit (%d chars)", activity_prefix, len(result))
+                if on_chunk and result:
+                    on_chunk(result)
+            else:
+                result = await self._stream_llm(
+                    system, context, user, emit, activity_prefix, max_tokens, max_retries,
+                    on_chunk=on_chunk, base=base, cap=cap, jitter=jitter,
+                    chunk_coalesce_bytes=chunk_coalesce_bytes, stop_at_json_end=stop_at_json_end,
+                    on_retry=on_retry,
+                )
+                if disk is not None and result:
+                    try:
+                        await asyncio.to_thread(disk.put, disk_key, result)
+                    except OSError as e:
+                        log.warning("LLM:%s disk cache write failed: %s", activity_prefix, e)
+        except BaseException as exc:
+            # Failures are not cached — waiters see the error, the next call retries
+            self._llm_cache.pop(key, None)
+            fut.set_exception(_OwnerCancelled() if isinstance(exc, asyncio.CancelledError) else exc)
+            fut.exception()  # mark retrieved: there may be no other waiters
+            raise
+        fut.set_result(result)
+        return result
+
+    async def call_llm_json(
+        self,
+        system: str,
+        user: str,
+        emit: EmitFn,
+        activity_prefix: str = "Thinking",
+        validate: Callable[[dict], _T] | None = None,
+        reasks: int = 1,
+        **kwargs,
+    ) -> tuple[str, dict | _T | None]:
+        """call_llm + parse_json, re-asking if the reply holds no usable JSON object.
+
+        json-repair already recovers truncated or sloppy JSON locally, so a reply
+        that still fails is prose or empty. A retry with an explicit reminder
+        fixes most of those and costs far less than downstream agents working
+        from an empty stub.
+
+        validate, when given, turns the parsed object into the caller's type and
+        raises ValueError if it is off-schema; the error is appended to the
+        re-ask so the model can correct itself. A rejected reply is dropped from
+        the dedup and disk caches so it is never replayed.
+
+        Returns (raw, result) after at most reasks re-asks; result is None if
+        every attempt failed. kwargs are passed through to call_llm.
+        """
+        prompt = user
+        for attempt in range(reasks + 1):
+            raw = await self.call_llm(system, prompt, emit, activity_prefix, **kwargs)
+            parsed = self.parse_json(raw)
+            if parsed is None:
+                problem, suffix = "held no JSON object", _JSON_RETRY_SUFFIX
+            elif validate is None:
+                return raw, parsed
+            else:
+                try:
+                    return raw, validate(parsed)
+                except ValueError as e:
+                    problem = f"failed validation: {str(e)[:500]}"
+                    suffix = _SCHEMA_RETRY_SUFFIX.format(problem=str(e)[:500])
+            log.warning("LLM:%s reply %s | first 200: %r", activity_prefix, problem, raw[:200])
+            await self._forget_response(
+                system, kwargs.get("context", ""), prompt, kwargs.get("max_tokens", DEFAULT_MAX_TOKENS)
+            )
+            prompt = user + suffix
+        return raw, None
+
+    def _llm_cache_key(self, system: str, context: str, user: str, ceiling: int) -> bytes:
+        return hashlib.blake2b(
+            f"{llm_cache_scope.get()}\x1f{system}\x1f{context}\x1f{user}\x1f{ceiling}".encode(),
+            digest_size=16,
+        ).digest()
+
+    def _disk_cache_key(self, system: str, context: str, user: str, ceiling: int) -> str:
+        return PromptCache.key(self.PROVIDER, MODEL, system, context, user, str(ceiling))
+
+    async def _forget_response(self, system: str, context: str, user: str, ceiling: int) -> None:
+        """Drop a cached response its caller rejected, from memory and disk."""
+        self._llm_cache.pop(self._llm_cache_key(system, context, user, ceiling), None)
+        disk = get_prompt_cache()
+        if disk is not None:
+            try:
+                await asyncio.to_thread(disk.delete, self._disk_cache_key(system, context, user, ceiling))
+            except OSError as e:
+                log.warning("disk cache delete failed: %s", e)
+
+    async def _stream(
+        self, system: str, context: str, user: str, max_tokens: int, json_only: bool = False
+    ) -> AsyncIterator[tuple[str, int | None]]:
+        """Provider adapter: yield (text_delta, output_tokens_so_far) per chunk.
+
+        This is the only Gemini-specific part of call_llm; retries, pacing,
+        coalescing and bookkeeping all live in _stream_llm.
+        """
+        cached = 0
+        async for chunk in await self.client.aio.models.generate_content_stream(
+            model=MODEL,
+            # Shared context first, so the cacheable prefix is as long as possible
+            contents=[context, user] if context else user,
+            config=genai.types.GenerateContentConfig(
+                system_instruction=system,
+                max_output_tokens=max_tokens,
+                response_mime_type="application/json" if json_only else None,
+            ),
+        ):
+            usage = chunk.usage_metadata
+            tokens = None
+            if usage is not None:
+                # Thinking tokens count against max_output_tokens, so include them
+                tokens = (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+                cached = usage.cached_content_token_count or cached
+            yield chunk.text or "", tokens
+        if cached:
+            log.debug("LLM: %d prompt tokens served from the implicit cache", cached)
+
+    def _prune_llm_cache(self, now: float) -> None:
+        cache = self._llm_cache
+        for k in [k for k, (expires_at, _) in cache.items() if expires_at <= now]:
+            del cache[k]
+        while len(cache) >= LLM_CACHE_MAXSIZE:
+            del cache[next(iter(cache))]  # oldest insertion first
+
+    async def _stream_llm(
+        self,
+        system: str,
+        context: str,
+        user: str,
+        emit: EmitFn,
+        activity_prefix: str,
+        max_tokens: int,
+        max_retries: int,
+        *,
+        on_chunk: Callable[[str], None] | None,
+        base: float,
+        cap: float,
+        jitter: float,
+        chunk_coalesce_bytes: int,
+        stop_at_json_end: bool = False,
+        on_retry: Callable[[], None] | None = None,
     ) -> str:
         """Stream a Gemini response, emitting activity dots while streaming.
 
-        Retries up to max_retries times on transient errors before raising.
+        on_chunk receives the text in windows of at least chunk_coalesce_bytes
+        characters (plus a final flush) rather than once per streamed fragment.
+        Retries transient errors (429, 5xx, network) up to max_retries times with
+        jittered exponential backoff; permanent 4xx errors are raised immediately.
         Returns the full response text.
         """
+        # Built once per call — every pulse is identical
+        pulse_payload = {
+            "agentIndex": self.role_index,
+            "message": f"{activity_prefix}…",
+            "level": "info",
+        }
+
         last_exc: Exception | None = None
         for attempt in range(max_retries):
+            if attempt and on_retry:
+                on_retry()
+            # on_chunk runs in its own task so slow callback work never stalls
+            # reading the next chunk off the network
+            pipe: asyncio.Queue[str | None] | None = None
+            consumer: asyncio.Task | None = None
+            if on_chunk:
+                pipe = asyncio.Queue(maxsize=16)
+                consumer = asyncio.create_task(_drain_chunks(pipe, on_chunk))
             try:
-                full_text = ""
-                last_activity_at = time.monotonic()
-
-                async for chunk in await self.client.aio.models.generate_content_stream(
-                    model=MODEL,
-                    contents=user,
-                    config=genai.types.GenerateContentConfig(
-                        system_instruction=system,
-                        max_output_tokens=max_tokens,
-                    ),
-                ):
-                    if chunk.text:
-                        full_text += chunk.text
-                        if on_chunk:
-                            on_chunk(chunk.text)
-
-                    now = time.monotonic()
-                    if now - last_activity_at > 1.5:
-                        self.emit_activity(emit, f"{activity_prefix}…", "info")
-                        last_activity_at = now
-
-                result = full_text.strip()
-                print(f"[LLM:{activity_prefix}] {len(result)} chars | max_tokens={max_tokens}")
+                parts: list[str] = []
+                total_len = 0
+                # on_chunk has been given parts[:flushed_parts] (flushed_len chars)
+                flushed_parts = flushed_len = 0
+                used = 0
+                deadline_ns = time.monotonic_ns() + _PULSE_INTERVAL_NS
+                json_end = _JsonEndDetector() if stop_at_json_end else None
+
+                # A slot is held only while streaming, never during retry backoff.
+                # aclosing: breaking out early must still release the HTTP stream.
+                async with _LLM_SLOTS, contextlib.aclosing(
+                    self._stream(system, context, user, max_tokens, stop_at_json_end)
+                ) as stream:
+                    async for text, tokens in stream:
+                        if tokens:
+                            used = tokens
+                        done = False
+                        if text:
+                            if json_end is not None and (end := json_end.feed(text)) >= 0:
+                                text, done = text[:end], True
+                            parts.append(text)
+                            total_len += len(text)
+                            if pipe and total_len - flushed_len >= chunk_coalesce_bytes:
+                                await _pipe_put(pipe, consumer, "".join(parts[flushed_parts:]))
+                                flushed_parts, flushed_len = len(parts), total_len
+                        if done:
+                            break
+
+                        now_ns = time.monotonic_ns()
+                        if now_ns >= deadline_ns:
+                            emit("activity", pulse_payload)
+                            deadline_ns = now_ns + _PULSE_INTERVAL_NS
+
+                if pipe:
+                    if flushed_parts < len(parts):
+                        await _pipe_put(pipe, consumer, "".join(parts[flushed_parts:]))
+                    await _pipe_put(pipe, consumer, None)
+                    await consumer
+
+                result = "".join(parts).strip()
+                _TOKEN_PROFILE[activity_prefix].append(used or total_len // 4)
+                log.debug("LLM:%s %d chars streamed | max_tokens=%d", activity_prefix, total_len, max_tokens)
                 return result
 
             except Exception as exc:
+                if consumer is not None:
+                    consumer.cancel()
+                if not _is_retryable(exc):
+                    log.error("LLM:%s unrecoverable error: %r", activity_prefix, exc)
+                    self.emit_activity(
+                        emit,
+                        f"{activity_prefix}: failed ({exc.__class__.__name__})",
+                        "error",
+                    )
+                    raise
                 last_exc = exc
-                wait = 2 ** attempt  # 1 s, 2 s, 4 s
-                print(f"[LLM:{activity_prefix}] attempt {attempt + 1} failed: {exc!r} — retrying in {wait}s")
+                if attempt == max_retries - 1:
+                    break
+                # Jittered backoff decorrelates retries from concurrently running agents
+                wait = min(cap, base * (2 ** attempt)) * (1 + random.uniform(0, jitter))
+                log.warning(
+                    "LLM:%s attempt %d failed: %r — retrying in %.1fs",
+                    activity_prefix, attempt + 1, exc, wait,
+                )
                 self.emit_activity(
                     emit,
                     f"{activity_prefix}: error, retrying… ({exc.__class__.__name__})",
@@ -0,0 +1,50 @@
+"""Shared Gemini client with a pooled HTTP transport.
+
+Every agent holds a reference to the same genai.Client, backed by one
+httpx.AsyncClient, so concurrent LLM calls reuse warm keep-alive
+connections instead of paying a TCP/TLS handshake per call.
+"""
+from __future__ import annotations
+
+import os
+import threading
+
+import httpx
+from google import genai
+
+# Idle connections survive the gaps between a designer's phases (milestone
+# reviews, parsing) instead of httpx's 5 s default, so the next call skips
+# the TLS handshake.
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=50, keepalive_expiry=60.0
+)
+# Generous read timeout: thinking models can pause well over a minute before
+# the first streamed token of a large prompt.
+HTTP_TIMEOUT = httpx.Timeout(300.0, connect=5.0)
+
+_http: httpx.AsyncClient | None = None
+_client: genai.Client | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> genai.Client:
+    """Return the process-wide genai.Client, creating it on first use."""
+    global _http, _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _http = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+                _client = genai.Client(
+                    api_key=os.environ["GEMINI_API_KEY"],
+                    http_options=genai.types.HttpOptions(httpx_async_client=_http),
+                )
+    return _client
+
+
+async def aclose_client() -> None:
+    """Close the pooled transport (called from the app lifespan on shutdown)."""
+    global _http, _client
+    if _http is not None:
+        await _http.aclose()
+    _http = None
+    _client = None
@@ -1,28 +1,24 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
+from typing import Any, Coroutine
 
+import orjson
 from google import genai
 
-from .base import BaseAgent, EmitFn
+from .base import BaseAgent, EmitFn, dump_scope_doc, gather_or_cancel, preview_json
+from .milestone_batcher import MilestoneBatcher, PendingReview
 from ..prompts import DESIGN_MANAGER_SYSTEM
 
+log = logging.getLogger(__name__)
+
 # Agent index in the frontend AGENTS array
 AGENT_INDEX = 0
 
+# ── Prompt templates (static skeletons, filled per call via format_map) ─────
 
-class DesignManager(BaseAgent):
-    def __init__(self, client: genai.Client) -> None:
-        super().__init__(AGENT_INDEX, client)
-
-    # ── Phase 0: brief analysis → scope document ─────────────────────────────
-
-    async def analyze_brief(self, brief: str, emit: EmitFn) -> dict:
-        """Ask Claude to analyze the brief and produce a Design Scope Document."""
-        self.emit_status(emit, "working", "Analyzing design brief", 0.1)
-        self.emit_activity(emit, "Reading design brief and identifying scope…")
-
-        user_prompt = f"""Analyze this design brief and produce a Design Scope Document.
+_ANALYZE_BRIEF_TMPL = """Analyze this design brief and produce a Design Scope Document.
 
 BRIEF:
 {brief}
@@ -53,23 +49,201 @@ Rules for clarifying_questions:
 - Options should be short (2–5 words each), actionable, and specific to this brief
 - Example questions: platform priority, target user type, visual style direction, key technical constraint
 """
+
+_KICKOFF_TMPL = """You are the Design Manager running a kickoff briefing for your team.
+
+Based on the confirmed Design Scope Document, provide a focused direction brief.
+
+SCOPE DOCUMENT:
+{scope_doc}
+
+Return a JSON object:
+{{
+  "design_approach": "1-2 sentences on the overall design philosophy for this project",
+  "primary_user_journey": "the single most critical user journey to nail first",
+  "quality_priorities": ["top priority", "second", "third"],
+  "recommended_patterns": ["specific UX or UI pattern to explore"],
+  "cautions": ["specific thing to avoid or watch out for"],
+  "kickoff_summary": "2-sentence briefing message to the team"
+}}
+"""
+
+_PONDER_TMPL = """You are the Design Manager. Your team is currently designing.
+Use this time to prepare for the upcoming review.
+
+SCOPE DOCUMENT:
+{scope_doc}
+
+Return a JSON object:
+{{
+  "quality_criteria": {{
+    "senior": ["criterion 1", "criterion 2"],
+    "visual": ["criterion 1", "criterion 2"],
+    "junior": ["criterion 1", "criterion 2"]
+  }},
+  "risk_areas": ["risk 1", "risk 2"],
+  "skill_evolution_directives": {{
+    "senior": "one sentence guidance to improve Senior this round",
+    "visual": "one sentence guidance to improve Visual this round",
+    "junior": "one sentence guidance to improve Junior this round"
+  }},
+  "junior_brief_addendum": "extra implementation notes for the Junior Designer",
+  "optimization_notes": "2-3 sentences on how to get the best result from this team on this project"
+}}
+"""
+
+_MILESTONE_TMPL = """Quick milestone review.
+
+AGENT: {agent_name}
+MILESTONE: {milestone_name}
+OUTPUT SUMMARY:
+{output_summary}
+
+SCOPE SUCCESS CRITERIA:
+{criteria}
+
+Return a JSON object (keep feedback ≤ 2 sentences):
+{{
+  "ok": true,
+  "score": 8,
+  "feedback": "specific actionable feedback",
+  "needs_human": false,
+  "reason": "reason human review is needed (empty string if not)"
+}}
+
+Only set needs_human=true for genuine quality risks or scope deviations that require human judgment.
+"""
+
+_MILESTONE_ITEM_TMPL = """[{n}] AGENT: {agent_name}
+MILESTONE: {milestone_name}
+OUTPUT SUMMARY:
+{output_summary}"""
+
+_MILESTONE_BATCH_TMPL = """Quick milestone review of {count} checkpoints. Review each one independently.
+
+{milestones}
+
+SCOPE SUCCESS CRITERIA:
+{criteria}
+
+Return a JSON object with exactly one review per checkpoint, in the same order (keep feedback ≤ 2 sentences):
+{{
+  "reviews": [
+    {{
+      "ok": true,
+      "score": 8,
+      "feedback": "specific actionable feedback",
+      "needs_human": false,
+      "reason": "reason human review is needed (empty string if not)"
+    }}
+  ]
+}}
+
+Only set needs_human=true for genuine quality risks or scope deviations that require human judgment.
+"""
+
+_CROSS_CRITIQUE_TMPL = """Cross-team design critique. Check UX ↔ design system alignment.
+
+SENIOR DESIGNER SUMMARY:
+- {flows_count} user flow(s), {screens_count} wireframed screen(s)
+- Handoff notes: {handoff}
+
+VISUAL DESIGNER SUMMARY:
+- Token groups: {token_keys}
+- Styled components: {comp_styles}
+
+SCOPE:
+Visual direction: {visual_direction}
+Technical constraints: {technical_constraints}
+Priority stack: {priority_stack}
+
+Return a JSON object:
+{{
+  "alignment_score": 8,
+  "alignment_issues": ["issue 1"],
+  "for_senior": "1-sentence feedback for Senior about visual alignment",
+  "for_visual": "1-sentence feedback for Visual about UX alignment",
+  "junior_notes": "implementation notes for Junior based on this cross-critique",
+  "summary": "1-sentence summary of the cross-critique outcome"
+}}
+"""
+
+_REVIEW_CRITERIA_TMPL = """
+QUALITY CRITERIA (prepared in advance):
+Senior: {senior}
+Visual: {visual}
+Junior: {junior}
+Risk areas: {risk_areas}
+Skill-evolution directives: {skill_dirs}
+Optimization notes: {optimization_notes}
+"""
+
+_REVIEW_SENIOR_TMPL = """
+SENIOR DESIGNER'S IMPLEMENTATION REVIEW:
+UX Adherence: {ux_adherence_score}/10
+Token Usage: {token_usage_score}/10
+Issues: {component_issues}
+Highlights: {positive_highlights}
+Assessment: {overall_assessment}
+"""
+
+_REVIEW_TMPL = """Final quality review of all three designer outputs.
+
+SCOPE DOCUMENT:
+{scope_doc}
+{criteria_section}{senior_review_section}
+SENIOR DESIGNER OUTPUT (summary):
+{senior_output}
+
+VISUAL DESIGNER OUTPUT (summary):
+{visual_output}
+
+JUNIOR DESIGNER OUTPUT (summary):
+{junior_output}
+
+Apply the prepared criteria and the Senior Designer's implementation review. Return a JSON object:
+{{
+  "overall_score": 8,
+  "scope_alignment": 9,
+  "completeness": 8,
+  "coherence": 8,
+  "production_readiness": 7,
+  "highlights": ["highlight 1"],
+  "issues": ["issue 1"],
+  "skill_evolution_applied": {{"senior": "note", "visual": "note", "junior": "note"}},
+  "summary": "2-3 sentence narrative"
+}}
+"""
+
+
+class DesignManager(BaseAgent):
+    def __init__(self, client: genai.Client) -> None:
+        super().__init__(AGENT_INDEX, client)
+        self._milestone_batcher = MilestoneBatcher(self._review_milestone_batch)
+
+    # ── Phase 0: brief analysis → scope document ─────────────────────────────
+
+    async def analyze_brief(self, brief: str, emit: EmitFn) -> dict:
+        """Ask Claude to analyze the brief and produce a Design Scope Document."""
+        self.emit_status(emit, "working", "Analyzing design brief", 0.1)
+        self.emit_activity(emit, "Reading design brief and identifying scope…")
+
+        user_prompt = _ANALYZE_BRIEF_TMPL.format_map({"brief": brief})
         raw = await self.call_llm(
             system=DESIGN_MANAGER_SYSTEM,
             user=user_prompt,
             emit=emit,
             activity_prefix="Analyzing brief",
             max_tokens=4096,
+            min_tokens=2048,
         )
 
         self.emit_status(emit, "working", "Synthesizing scope document", 0.6)
         self.emit_activity(emit, "Scope document ready for review", "success")
 
-        try:
-            result = json.loads(self.clean_json(raw))
-            if isinstance(result, dict):
-                return result
-        except Exception:
-            pass
+        result = self.parse_json(raw)
+        if result is not None:
+            return result
         return {
             "project_overview": brief[:200],
             "target_users": "To be clarified",
@@ -85,7 +259,12 @@ Rules for clarifying_questions:
 
     # ── Phase 0b: kickoff — align team on design direction ────────────────────
 
-    async def kickoff_with_senior(self, scope_doc: dict, emit: EmitFn) -> dict:
+    async def kickoff_with_senior(
+        self,
+        scope_doc: dict,
+        emit: EmitFn,
+        scope_doc_json: str | None = None,
+    ) -> dict:
         """Run the design kickoff and produce a direction brief for the Senior Designer.
 
         This is where the Manager actively shapes the creative approach before
@@ -94,40 +273,22 @@ Rules for clarifying_questions:
         self.emit_status(emit, "working", "Running design team kickoff…", 0.2)
         self.emit_activity(emit, "Briefing team on scope priorities and direction…")
 
-        user_prompt = f"""You are the Design Manager running a kickoff briefing for your team.
-
-Based on the confirmed Design Scope Document, provide a focused direction brief.
-
-SCOPE DOCUMENT:
-{json.dumps(scope_doc, indent=2)}
-
-Return a JSON object:
-{{
-  "design_approach": "1-2 sentences on the overall design philosophy for this project",
-  "primary_user_journey": "the single most critical user journey to nail first",
-  "quality_priorities": ["top priority", "second", "third"],
-  "recommended_patterns": ["specific UX or UI pattern to explore"],
-  "cautions": ["specific thing to avoid or watch out for"],
-  "kickoff_summary": "2-sentence briefing message to the team"
-}}
-"""
+        user_prompt = _KICKOFF_TMPL.format_map({
+            "scope_doc": scope_doc_json or dump_scope_doc(scope_doc),
+        })
         raw = await self.call_llm(
             system=DESIGN_MANAGER_SYSTEM,
             user=user_prompt,
             emit=emit,
             activity_prefix="Briefing team",
             max_tokens=1024,
+            min_tokens=512,
         )
 
         self.emit_status(emit, "reviewing", "Kickoff complete — team is now designing", 0.3)
         self.emit_activity(emit, "Direction brief delivered. Monitoring team progress…", "success")
 
-        try:
-            result = json.loads(self.clean_json(raw))
-            if not isinstance(result, dict):
-                result = {}
-        except Exception:
-            result = {}
+        result = self.parse_json(raw) or {}
 
         summary = result.get("kickoff_summary", "")
         if summary:
@@ -136,7 +297,12 @@ Return a JSON object:
 
     # ── Phase 1 (concurrent): ponder optimization while designers work ────────
 
-    async def ponder_optimizations(self, scope_doc: dict, emit: EmitFn) -> dict:
+    async def ponder_optimizations(
+        self,
+        scope_doc: dict,
+        emit: EmitFn,
+        scope_doc_json: str | None = None,
+    ) -> dict:
         """Run concurrently with Senior + Visual designers.
 
         Prepares quality criteria, risk analysis, and skill-evolution directives
@@ -145,29 +311,9 @@ Return a JSON object:
         self.emit_status(emit, "working", "Preparing quality criteria…", 0.15)
         self.emit_activity(emit, "While designers work, analysing scope for edge cases…")
 
-        user_prompt = f"""You are the Design Manager. Your team is currently designing.
-Use this time to prepare for the upcoming review.
-
-SCOPE DOCUMENT:
-{json.dumps(scope_doc, indent=2)}
-
-Return a JSON object:
-{{
-  "quality_criteria": {{
-    "senior": ["criterion 1", "criterion 2"],
-    "visual": ["criterion 1", "criterion 2"],
-    "junior": ["criterion 1", "criterion 2"]
-  }},
-  "risk_areas": ["risk 1", "risk 2"],
-  "skill_evolution_directives": {{
-    "senior": "one sentence guidance to improve Senior this round",
-    "visual": "one sentence guidance to improve Visual this round",
-    "junior": "one sentence guidance to improve Junior this round"
-  }},
-  "junior_brief_addendum": "extra implementation notes for the Junior Designer",
-  "optimization_notes": "2-3 sentences on how to get the best result from this team on this project"
-}}
-"""
+        user_prompt = _PONDER_TMPL.format_map({
+            "scope_doc": scope_doc_json or dump_scope_doc(scope_doc),
+        })
         self.emit_status(emit, "working", "Drafting skill-evolution directives…", 0.4)
         self.emit_activity(emit, "Identifying risk areas and preparing review criteria…")
 
@@ -177,17 +323,19 @@ Return a JSON object:
             emit=emit,
             activity_prefix="Pondering",
             max_tokens=2048,
+            min_tokens=1024,
         )
 
         self.emit_status(emit, "reviewing", "Criteria ready — monitoring team progress…", 0.7)
         self.emit_activity(emit, "Review criteria complete. Awaiting milestone updates.", "success")
 
-        try:
-            result = json.loads(self.clean_json(raw))
-            if isinstance(result, dict):
-                return result
-        except Exception:
-            pass
+        result = self.parse_json(raw)
+        if result is not None:
+            return result
+        return self._default_optimization_prep(raw)
+
+    @staticmethod
+    def _default_optimization_prep(raw: str = "") -> dict:
         return {
             "quality_criteria": {"senior": [], "visual": [], "junior": []},
             "risk_areas": [],
@@ -197,6 +345,41 @@ Return a JSON object:
             "_raw": raw,
         }
 
+    async def run_phase(
+        self,
+        scope_doc: dict,
+        emit: EmitFn,
+        *designer_coros: Coroutine[Any, Any, dict],
+        scope_doc_json: str | None = None,
+    ) -> tuple[list[dict], asyncio.Task[dict]]:
+        """Run designer coroutines concurrently with ponder_optimizations.
+
+        All LLM round-trips overlap, so the phase takes max(calls) rather than
+        sum(calls). Returns (designer_outputs, ponder_task): the phase ends when
+        the designers do, and the ponder task — possibly still running — is
+        resolved later with optimization_prep(). A failed designer is re-raised
+        since its output is required downstream, and the phase's other calls
+        are cancelled rather than left streaming for a run that has already failed.
+        """
+        ponder_task = asyncio.create_task(
+            self.ponder_optimizations(scope_doc, emit, scope_doc_json=scope_doc_json)
+        )
+        try:
+            designer_results = await gather_or_cancel(*designer_coros)
+        except BaseException:
+            ponder_task.cancel()
+            raise
+        return designer_results, ponder_task
+
+    async def optimization_prep(self, ponder_task: asyncio.Task[dict], emit: EmitFn) -> dict:
+        """Await a ponder task from run_phase; a failed ponder falls back to empty criteria."""
+        try:
+            return await ponder_task
+        except Exception:
+            log.warning("ponder_optimizations failed", exc_info=True)
+            self.emit_activity(emit, "Review criteria unavailable — using defaults.", "warn")
+            return self._default_optimization_prep()
+
     # ── Milestone review — called after each agent checkpoint ─────────────────
 
     async def review_milestone(
@@ -210,56 +393,22 @@ Return a JSON object:
         """Quick milestone review of an agent's partial output.
 
         Returns {ok, score, feedback, needs_human, reason}.
-        Keeps the token budget tight — this is a rapid gut-check, not a deep review.
+        Reviews arriving together (e.g. Senior + Visual) are batched into one call.
         """
         self.emit_status(emit, "reviewing", f"Milestone check: {agent_name}", 0.5)
         self.emit_activity(emit, f"Reviewing {agent_name} — {milestone_name}…")
 
-        user_prompt = f"""Quick milestone review.
-
-AGENT: {agent_name}
-MILESTONE: {milestone_name}
-OUTPUT SUMMARY:
-{output_summary[:600]}
-
-SCOPE SUCCESS CRITERIA:
-{json.dumps(scope_doc.get('success_criteria', []))}
-
-Return a JSON object (keep feedback ≤ 2 sentences):
-{{
-  "ok": true,
-  "score": 8,
-  "feedback": "specific actionable feedback",
-  "needs_human": false,
-  "reason": "reason human review is needed (empty string if not)"
-}}
-
-Only set needs_human=true for genuine quality risks or scope deviations that require human judgment.
-"""
-        raw = await self.call_llm(
-            system=DESIGN_MANAGER_SYSTEM,
-            user=user_prompt,
-            emit=emit,
-            activity_prefix=f"Checking {agent_name}",
-            max_tokens=768,
+        result = await self._milestone_batcher.submit(
+            agent_name, milestone_name, output_summary, scope_doc, emit
         )
 
-        try:
-            result = json.loads(self.clean_json(raw))
-            if not isinstance(result, dict):
-                result = {}
-        except Exception:
-            result = {}
-        if not result:
-            result = {"ok": True, "score": 7, "feedback": "", "needs_human": False, "reason": ""}
-
         try:
             score = int(result.get("score", 7))
         except (TypeError, ValueError):
             score = 7
         ok = bool(result.get("ok", True))
         level = "success" if ok and score >= 7 else "warn" if score >= 5 else "error"
-        feedback_preview = result.get("feedback", "")[:80]
+        feedback_preview = str(result.get("feedback", ""))[:80]
         self.emit_activity(
             emit,
             f"{agent_name} [{milestone_name}]: {score}/10 — {feedback_preview}",
@@ -267,6 +416,62 @@ Only set needs_human=true for genuine quality risks or scope deviations that req
         )
         return result
 
+    async def _review_milestone_batch(self, batch: list[PendingReview], emit: EmitFn) -> list[dict]:
+        """Review one or more pending milestones in a single LLM call.
+
+        Keeps the token budget tight — this is a rapid gut-check, not a deep review.
+        """
+        default = {"ok": True, "score": 7, "feedback": "", "needs_human": False, "reason": ""}
+        # Batches are per-emit, i.e. per session, so they share one scope doc
+        criteria = orjson.dumps(batch[0].scope_doc.get("success_criteria", [])).decode()
+
+        if len(batch) == 1:
+            item = batch[0]
+            user_prompt = _MILESTONE_TMPL.format_map({
+                "agent_name": item.agent_name,
+                "milestone_name": item.milestone_name,
+                "output_summary": item.output_summary[:600],
+                "criteria": criteria,
+            })
+            activity_prefix = f"Checking {item.agent_name}"
+        else:
+            milestones = "\n\n".join(
+                _MILESTONE_ITEM_TMPL.format_map({
+                    "n": i,
+                    "agent_name": item.agent_name,
+                    "milestone_name": item.milestone_name,
+                    "output_summary": item.output_summary[:600],
+                })
+                for i, item in enumerate(batch, 1)
+            )
+            user_prompt = _MILESTONE_BATCH_TMPL.format_map({
+                "count": len(batch),
+                "milestones": milestones,
+                "criteria": criteria,
+            })
+            activity_prefix = f"Checking {len(batch)} milestones"
+
+        raw = await self.call_llm(
+            system=DESIGN_MANAGER_SYSTEM,
+            user=user_prompt,
+            emit=emit,
+            activity_prefix=activity_prefix,
+            max_tokens=768 * len(batch),
+            min_tokens=384 * len(batch),
+        )
+
+        parsed = self.parse_json(raw) or {}
+
+        if len(batch) == 1:
+            return [parsed or default]
+
+        reviews = parsed.get("reviews", [])
+        if not isinstance(reviews, list):
+            reviews = []
+        results = [r if isinstance(r, dict) and r else default for r in reviews[:len(batch)]]
+        results += [default] * (len(batch) - len(results))
+        return results
+
     # ── Cross-team critique ───────────────────────────────────────────────────
 
     async def cross_critique(
@@ -288,47 +493,28 @@ Only set needs_human=true for genuine quality risks or scope deviations that req
         cs = visual_output.get("component_styles", {})
         comp_styles = list(cs.keys())[:6] if isinstance(cs, dict) else []
 
-        user_prompt = f"""Cross-team design critique. Check UX ↔ design system alignment.
-
-SENIOR DESIGNER SUMMARY:
-- {flows_count} user flow(s), {screens_count} wireframed screen(s)
-- Handoff notes: {handoff}
-
-VISUAL DESIGNER SUMMARY:
-- Token groups: {token_keys}
-- Styled components: {comp_styles}
-
-SCOPE:
-Visual direction: {scope_doc.get('visual_direction', '')}
-Technical constraints: {scope_doc.get('technical_constraints', '')}
-Priority stack: {scope_doc.get('priority_stack', [])}
-
-Return a JSON object:
-{{
-  "alignment_score": 8,
-  "alignment_issues": ["issue 1"],
-  "for_senior": "1-sentence feedback for Senior about visual alignment",
-  "for_visual": "1-sentence feedback for Visual about UX alignment",
-  "junior_notes": "implementation notes for Junior based on this cross-critique",
-  "summary": "1-sentence summary of the cross-critique outcome"
-}}
-"""
+        user_prompt = _CROSS_CRITIQUE_TMPL.format_map({
+            "flows_count": flows_count,
+            "screens_count": screens_count,
+            "handoff": handoff,
+            "token_keys": token_keys,
+            "comp_styles": comp_styles,
+            "visual_direction": scope_doc.get("visual_direction", ""),
+            "technical_constraints": scope_doc.get("technical_constraints", ""),
+            "priority_stack": scope_doc.get("priority_stack", []),
+        })
         raw = await self.call_llm(
             system=DESIGN_MANAGER_SYSTEM,
             user=user_prompt,
             emit=emit,
             activity_prefix="Cross-critiquing",
             max_tokens=1024,
+            min_tokens=512,
         )
 
         self.emit_status(emit, "reviewing", "Cross-critique complete", 0.65)
 
-        try:
-            result = json.loads(self.clean_json(raw))
-            if not isinstance(result, dict):
-                result = {}
-        except Exception:
-            result = {}
+        result = self.parse_json(raw) or {}
         if not result:
             result = {
                 "alignment_score": 8,
@@ -363,6 +549,7 @@ Return a JSON object:
         emit: EmitFn,
         optimization_prep: dict | None = None,
         senior_impl_review: dict | None = None,
+        scope_doc_json: str | None = None,
     ) -> dict:
         """Produce the final quality report, applying the criteria prepared in advance."""
         self.emit_status(emit, "reviewing", "Applying pre-prepared criteria to all deliverables…", 0.8)
@@ -377,69 +564,46 @@ Return a JSON object:
                 risk_areas = []
             skill_dirs_raw = optimization_prep.get("skill_evolution_directives", {})
             skill_dirs = skill_dirs_raw if isinstance(skill_dirs_raw, dict) else {}
-            criteria_section = f"""
-QUALITY CRITERIA (prepared in advance):
-Senior: {criteria.get("senior", [])}
-Visual: {criteria.get("visual", [])}
-Junior: {criteria.get("junior", [])}
-Risk areas: {risk_areas}
-Skill-evolution directives: {json.dumps(skill_dirs)}
-Optimization notes: {optimization_prep.get("optimization_notes", "")}
-"""
+            criteria_section = _REVIEW_CRITERIA_TMPL.format_map({
+                "senior": criteria.get("senior", []),
+                "visual": criteria.get("visual", []),
+                "junior": criteria.get("junior", []),
+                "risk_areas": risk_areas,
+                "skill_dirs": orjson.dumps(skill_dirs).decode(),
+                "optimization_notes": optimization_prep.get("optimization_notes", ""),
+            })
 
         senior_review_section = ""
         if senior_impl_review:
-            senior_review_section = f"""
-SENIOR DESIGNER'S IMPLEMENTATION REVIEW:
-UX Adherence: {senior_impl_review.get("ux_adherence_score", "N/A")}/10
-Token Usage: {senior_impl_review.get("token_usage_score", "N/A")}/10
-Issues: {senior_impl_review.get("component_issues", [])}
-Highlights: {senior_impl_review.get("positive_highlights", [])}
-Assessment: {senior_impl_review.get("overall_assessment", "")}
-"""
-
-        user_prompt = f"""Final quality review of all three designer outputs.
-
-SCOPE DOCUMENT:
-{json.dumps(scope_doc, indent=2)}
-{criteria_section}{senior_review_section}
-SENIOR DESIGNER OUTPUT (summary):
-{str(senior_output)[:400]}
-
-VISUAL DESIGNER OUTPUT (summary):
-{str(visual_output)[:400]}
-
-JUNIOR DESIGNER OUTPUT (summary):
-{str(junior_output)[:400]}
-
-Apply the prepared criteria and the Senior Designer's implementation review. Return a JSON object:
-{{
-  "overall_score": 8,
-  "scope_alignment": 9,
-  "completeness": 8,
-  "coherence": 8,
-  "production_readiness": 7,
-  "highlights": ["highlight 1"],
-  "issues": ["issue 1"],
-  "skill_evolution_applied": {{"senior": "note", "visual": "note", "junior": "note"}},
-  "summary": "2-3 sentence narrative"
-}}
-"""
+            senior_review_section = _REVIEW_SENIOR_TMPL.format_map({
+                "ux_adherence_score": senior_impl_review.get("ux_adherence_score", "N/A"),
+                "token_usage_score": senior_impl_review.get("token_usage_score", "N/A"),
+                "component_issues": senior_impl_review.get("component_issues", []),
+                "positive_highlights": senior_impl_review.get("positive_highlights", []),
+                "overall_assessment": senior_impl_review.get("overall_assessment", ""),
+            })
+
+        user_prompt = _REVIEW_TMPL.format_map({
+            "scope_doc": scope_doc_json or dump_scope_doc(scope_doc),
+            "criteria_section": criteria_section,
+            "senior_review_section": senior_review_section,
+            "senior_output": preview_json(senior_output),
+            "visual_output": preview_json(visual_output),
+            "junior_output": preview_json(junior_output),
+        })
         raw = await self.call_llm(
             system=DESIGN_MANAGER_SYSTEM,
             user=user_prompt,
             emit=emit,
             activity_prefix="Final review",
             max_tokens=1024,
+            min_tokens=512,
         )
 
         self.emit_status(emit, "complete", "Final review complete", 1.0, False)
         self.emit_activity(emit, "All deliverables reviewed and packaged", "success")
 
-        try:
-            result = json.loads(self.clean_json(raw))
-            if isinstance(result, dict):
-                return result
-        except Exception:
-            pass
+        result = self.parse_json(raw)
+        if result is not None:
+            return result
         return {"summary": raw, "_raw": raw}
@@ -1,13 +1,37 @@
 from __future__ import annotations
 
-import json
-from typing import Awaitable, Callable
+import asyncio
+import logging
+import re
+import time
+from typing import Callable
 
+import orjson
 from google import genai
-
-from .base import BaseAgent, EmitFn
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+
+from .base import (
+    BaseAgent,
+    EmitFn,
+    MilestoneFn,
+    dig,
+    dump_within,
+    preview_json,
+    strip_fences,
+)
 from ..prompts import JUNIOR_DESIGNER_SYSTEM
 
+log = logging.getLogger(__name__)
+
+# Characters that end a plain run inside a JSON string value
+_SPECIAL = re.compile(r'["\\]')
+_LOW_SURROGATE = re.compile(r'\\u[dD][c-fC-F][0-9a-fA-F]{2}')
+# JSON single-char escapes -> decoded char (unknown escapes decode to themselves)
+_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f',
+    '"': '"', '\\': '\\', '/': '/',
+}
+
 
 class _HtmlStreamExtractor:
     """Extracts the html_prototype string value from a streaming JSON response.
@@ -18,155 +42,196 @@ class _HtmlStreamExtractor:
     This class scans the raw text stream chunk-by-chunk and calls
     on_html_delta(delta) with each unescaped HTML fragment as it arrives,
     enabling real-time prototype preview without waiting for the full response.
+    Plain runs between quotes/backslashes are copied as whole slices, so the
+    per-character cost is paid only for escapes.
+
+    The decoded fragments are kept in html_parts, and [start, end) records
+    where the string literal sat in the stream, so the caller can parse the
+    rest of the object without decoding the HTML a second time. Offsets
+    count from the first non-whitespace character, matching the stripped
+    text call_llm returns.
     """
 
     _MARKER = '"html_prototype"'
 
     def __init__(self, on_html_delta: Callable[[str], None]) -> None:
         self._on = on_html_delta
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything fed so far (the stream is starting over)."""
         self._buf = ""
         self._state = "seek"   # seek | skip_to_quote | extract | done
-        self._escape = False   # True when the previous char was a backslash
+        self._fed = 0          # total chars fed so far, leading whitespace excluded
+        self._started = False  # seen a non-whitespace char yet
+        self.html_parts: list[str] = []
+        self.start: int | None = None  # offset of the opening quote
+        self.end: int | None = None    # offset just past the closing quote
 
     def feed(self, raw: str) -> None:
         if self._state == "done":
             return
+        if not self._started:
+            raw = raw.lstrip()
+            if not raw:
+                return
+            self._started = True
 
-        self._buf += raw
+        # Scan one string by position; only a short unconsumed tail (partial
+        # marker or escape) is ever carried over, so the buffer stays bounded.
+        b = self._buf + raw if self._buf else raw
+        base = self._fed - len(self._buf)  # stream offset of b[0]
+        self._fed += len(raw)
+        pos = 0
 
         if self._state == "seek":
-            idx = self._buf.find(self._MARKER)
+            idx = b.find(self._MARKER)
             if idx == -1:
                 # Retain the tail in case the marker spans two chunks
                 tail = len(self._MARKER) - 1
-                self._buf = self._buf[-tail:] if len(self._buf) > tail else self._buf
+                self._buf = b[-tail:] if len(b) > tail else b
                 return
-            self._buf = self._buf[idx + len(self._MARKER):]
+            pos = idx + len(self._MARKER)
             self._state = "skip_to_quote"
 
         if self._state == "skip_to_quote":
-            q = self._buf.find('"')
+            q = b.find('"', pos)
             if q == -1:
-                self._buf = self._buf[-4:] if len(self._buf) > 4 else self._buf
+                self._buf = ""
                 return
-            self._buf = self._buf[q + 1:]  # consume the opening quote
+            self.start = base + q
+            pos = q + 1  # consume the opening quote
             self._state = "extract"
 
         if self._state == "extract":
             out: list[str] = []
-            i = 0
-            b = self._buf
-            n = len(b)
-
-            while i < n:
-                ch = b[i]
-                if self._escape:
-                    self._escape = False
-                    if   ch == 'n':  out.append('\n')
-                    elif ch == 't':  out.append('\t')
-                    elif ch == 'r':  out.append('\r')
-                    elif ch == '"':  out.append('"')
-                    elif ch == '\\': out.append('\\')
-                    elif ch == '/':  out.append('/')
-                    elif ch == 'u' and i + 4 < n:
-                        try:
-                            out.append(chr(int(b[i + 1:i + 5], 16)))
-                        except ValueError:
-                            out.append('\\u' + b[i + 1:i + 5])
-                        i += 4
-                    else:
-                        out.append(ch)
-                elif ch == '\\':
-                    self._escape = True
-                elif ch == '"':
+            while True:
+                m = _SPECIAL.search(b, pos)
+                if m is None:
+                    out.append(b[pos:])
+                    pos = len(b)
+                    break
+                j = m.start()
+                if j > pos:
+                    out.append(b[pos:j])  # plain run — copied in one slice
+                if b[j] == '"':
                     # Closing quote — HTML string is complete
-                    if out:
-                        self._on(''.join(out))
                     self._state = "done"
-                    self._buf = ""
-                    return
-                else:
-                    out.append(ch)
-                i += 1
-
-            if out:
-                self._on(''.join(out))
-            self._buf = ""  # consumed; _escape preserved for next call
-
-AGENT_INDEX = 2
-
-MilestoneFn = Callable[[str, str], Awaitable[str]]
-
-
-class JuniorDesigner(BaseAgent):
-    def __init__(self, client: genai.Client) -> None:
-        super().__init__(AGENT_INDEX, client)
-
-    async def run(
-        self,
-        scope_doc: dict,
-        senior_output: dict,
-        visual_output: dict,
-        emit: EmitFn,
-        manager_addendum: str = "",
-        cross_critique_notes: str = "",
-        on_milestone: MilestoneFn | None = None,
-    ) -> dict:
-        """Two-phase implementation with Manager milestone reviews.
-
-        Phase 1: core React components (the most critical ones from wireframes)
-        Phase 2: remaining components + self-contained HTML prototype
-        """
-        # Compact inputs to stay within context budget
-        wireframes = senior_output.get("wireframes", [])[:2]
-        handoff = senior_output.get("handoff_notes", "")[:300]
-        tokens = visual_output.get("design_tokens", {})
-        if not isinstance(tokens, dict):
-            tokens = {}
-        comp_styles = visual_output.get("component_styles", {})
-        if not isinstance(comp_styles, dict):
-            comp_styles = {}
-
-        # Safe nested accessors — LLM sometimes returns strings instead of dicts
-        def _d(obj: object, *keys, default=None):
-            """Safe nested dict get that tolerates non-dict values."""
-            for key in keys:
-                if not isinstance(obj, dict):
-                    return default
-                obj = obj.get(key, default)
-            return obj
-
-        color_semantic = _d(tokens, 'color', 'semantic', default={}) or {}
-        font_family = _d(tokens, 'typography', 'fontFamily', default={}) or {}
-        spacing_base = _d(tokens, 'spacing', 'base', default='4px') or '4px'
-        if not isinstance(spacing_base, str):
-            spacing_base = '4px'
-
-        extra_notes = "\n".join(filter(None, [manager_addendum, cross_critique_notes]))
-
-        # ── Phase 1: Core components ──────────────────────────────────────────
-        self.emit_status(emit, "working", "Building core React components", 0.1)
-        self.emit_activity(emit, "Reading wireframes, tokens, and Manager brief…")
-
-        core_prompt = f"""Build the most critical React components from the wireframes.
+                    self.end = base + j + 1
+                    pos = len(b)
+                    break
+                # Backslash: decode one escape, or wait for the rest of it
+                if j + 1 >= len(b):
+                    pos = j
+                    break
+                ch = b[j + 1]
+                if ch == 'u':
+                    if j + 6 > len(b):
+                        pos = j
+                        break
+                    hex_digits = b[j + 2:j + 6]
+                    try:
+                        cp = int(hex_digits, 16)
+                    except ValueError:
+                        out.append('\\u' + hex_digits)
+                        pos = j + 6
+                        continue
+                    if 0xD800 <= cp < 0xDC00:
+                        # High surrogate: join it with the \uDCxx half that follows
+                        if j + 12 > len(b):
+                            pos = j
+                            break
+                        lo = int(b[j + 8:j + 12], 16) if _LOW_SURROGATE.match(b, j + 6) else 0
+                        if lo:
+                            out.append(chr(0x10000 + ((cp - 0xD800) << 10) + (lo - 0xDC00)))
+                            pos = j + 12
+                            continue
+                    out.append(chr(cp))
+                    pos = j + 6
+                    continue
+                out.append(_ESCAPES.get(ch, ch))
+                pos = j + 2
+
+            # Keep only an incomplete trailing escape for the next chunk
+            self._buf = b[pos:]
+            html = ''.join(out)
+            if html:
+                self.html_parts.append(html)
+                self._on(html)
+
+
+# ── Response schemas ─────────────────────────────────────────────────────────
+# Validated in one pass by pydantic-core; fields the LLM adds are kept.
+
+class ComponentSpec(BaseModel):
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    name: str = ""
+    tsx_code: str = ""
+    props_doc: str = ""
+
+    @field_validator("name", "tsx_code", "props_doc", mode="before")
+    @classmethod
+    def _null_is_empty(cls, v: object) -> object:
+        return "" if v is None else v
+
+
+class JuniorCoreOutput(BaseModel):
+    components: list[ComponentSpec] = []
+
+
+# Keys a well-formed Phase 2 reply carries; a splice that loses one is discarded
+_PROTO_KEYS = frozenset({"components", "html_prototype", "implementation_notes"})
+
+
+class JuniorProtoOutput(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    components: list[ComponentSpec] = []
+    html_prototype: str = ""
+    implementation_notes: str = ""
+
+    @field_validator("html_prototype", "implementation_notes", mode="before")
+    @classmethod
+    def _null_is_empty(cls, v: object) -> object:
+        return "" if v is None else v
+
+
+def _describe(e: ValidationError) -> str:
+    """One line per validation error, without pydantic's doc URLs."""
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def _validate_core(data: dict) -> JuniorCoreOutput:
+    try:
+        return JuniorCoreOutput.model_validate(data)
+    except ValidationError as e:
+        raise ValueError(_describe(e)) from None
+
+
+# ── Prompt templates (static skeletons, filled per call via format_map) ─────
+# Payloads are dumped compactly (orjson's default): whitespace is pure
+# overhead, and the truncated dumps keep more real content within their limit.
+
+_CORE_TMPL = """Build the most critical React components from the wireframes.
 
 SCOPE:
-{json.dumps(scope_doc.get('in_scope', []))}
-Technical constraints: {scope_doc.get('technical_constraints', '')}
+{in_scope}
+Technical constraints: {technical_constraints}
 
 MANAGER NOTES:
-{extra_notes if extra_notes else "Follow the wireframes and apply all design tokens."}
+{manager_notes}
 
 WIREFRAMES (top 2 screens):
-{json.dumps(wireframes, indent=2)}
+{wireframes}
 
 DESIGN TOKENS (key values):
-Colors: {json.dumps(color_semantic, indent=2)}
+Colors: {colors}
 Typography: fontFamily={font_family}
 Spacing base: {spacing_base}
 
 COMPONENT STYLES:
-{json.dumps(comp_styles, indent=2)}
+{component_styles}
 
 HANDOFF NOTES:
 {handoff}
@@ -188,78 +253,30 @@ Rules:
 - Semantic HTML with ARIA attributes
 - TypeScript with explicit prop interfaces
 """
-        core_raw = await self.call_llm(
-            system=JUNIOR_DESIGNER_SYSTEM,
-            user=core_prompt,
-            emit=emit,
-            activity_prefix="Building core components",
-            max_tokens=4096,
-        )
-
-        try:
-            core_data = json.loads(self.clean_json(core_raw))
-            if not isinstance(core_data, dict):
-                core_data = {"components": []}
-        except Exception as e:
-            print(f"[Junior core_data JSON error] {e} | first 300: {core_raw[:300]}")
-            core_data = {"components": []}
-
-        core_components = core_data.get("components", [])
-        if not isinstance(core_components, list):
-            core_components = []
-        core_count = len(core_components)
-        core_names = [c.get("name", "") for c in core_components[:3] if isinstance(c, dict)]
-        self.emit_activity(emit, f"Core components ready: {', '.join(core_names)}.", "success")
-        self.emit_status(emit, "working", "Core components done — awaiting Manager review", 0.45)
-
-        # ── Milestone 1: core components review ───────────────────────────────
-        feedback_1 = ""
-        if on_milestone:
-            summary = (
-                f"{core_count} core component(s): {', '.join(core_names)}. "
-                f"Built from wireframes with full token integration."
-            )
-            feedback_1 = await on_milestone("core_components", summary)
-            if feedback_1:
-                self.emit_activity(emit, f"Manager feedback: {feedback_1[:100]}")
-
-        # ── Phase 2: Remaining components + HTML prototype ────────────────────
-        self.emit_status(emit, "working", "Building remaining components & prototype", 0.6)
-        self.emit_activity(emit, "Completing full component set and assembling prototype…")
 
-        all_wireframes = senior_output.get("wireframes", [])
-        remaining_wireframes = all_wireframes[2:]
-        interaction_specs = senior_output.get("interaction_specs", {})
-
-        # Summarise already-built component code (truncated) for context
-        core_code_summary = "\n".join(
-            f"// {c.get('name','')}.tsx\n{str(c.get('tsx_code',''))[:400]}"
-            for c in core_data.get("components", [])[:3]
-        )
-
-        proto_prompt = f"""Complete the remaining components and build a FULL self-contained HTML prototype.
+_PROTO_TMPL = """Complete the remaining components and build a FULL self-contained HTML prototype.
 
 SCOPE:
-{json.dumps(scope_doc.get('in_scope', []))}
-Project overview: {scope_doc.get('project_overview', '')}
+{in_scope}
+Project overview: {project_overview}
 
 ALREADY BUILT COMPONENTS (reference — do not duplicate React code):
-{core_code_summary or "None yet — build all components."}
+{core_code_summary}
 
 ALL WIREFRAMES (use ALL of these to build the HTML prototype):
-{json.dumps(all_wireframes, indent=2)[:1500]}
+{all_wireframes}
 
 REMAINING WIREFRAMES (additional React components to produce if any):
-{json.dumps(remaining_wireframes[:2], indent=2)}
+{remaining_wireframes}
 
 INTERACTION SPECS:
-{json.dumps(interaction_specs, indent=2)[:400]}
+{interaction_specs}
 
 MANAGER REVIEW FEEDBACK ON CORE COMPONENTS:
-{feedback_1 if feedback_1 else "Core components approved. Maintain the same quality standard."}
+{feedback}
 
 FULL TOKEN SET:
-{json.dumps(tokens, indent=2)[:1000]}
+{tokens}
 
 Return a JSON object:
 {{
@@ -283,41 +300,142 @@ CRITICAL — html_prototype requirements:
 - Must look like a polished, real product ready for stakeholder review
 - Completely self-contained — zero external imports, all CSS/JS inline
 """
-        # Stream HTML prototype in real-time via SSE so the frontend can show
-        # a live preview as the LLM writes it.
-        accumulated_html = ""
 
-        def _on_html_delta(delta: str) -> None:
-            nonlocal accumulated_html
-            accumulated_html += delta
-            emit("prototype_stream", {"delta": delta})
 
-        extractor = _HtmlStreamExtractor(_on_html_delta)
+AGENT_INDEX = 2
+
+# Phase 1 re-asks when the response is unparseable or fails schema validation
+CORE_SCHEMA_RETRIES = 2
+
+# prototype_stream framing: emit once this many chars are pending, or once
+# this long has passed since the last frame (sub-frame, so preview stays live)
+PROTO_FRAME_CHARS = 512
+PROTO_FRAME_S = 0.03
 
-        proto_raw = await self.call_llm(
-            system=JUNIOR_DESIGNER_SYSTEM,
-            user=proto_prompt,
-            emit=emit,
-            activity_prefix="Building prototype",
-            max_tokens=12000,
-            on_chunk=extractor.feed,
-        )
 
-        try:
-            proto_data = json.loads(self.clean_json(proto_raw))
-            if not isinstance(proto_data, dict):
-                proto_data = {"components": [], "html_prototype": "", "implementation_notes": ""}
-        except Exception as e:
-            print(f"[Junior proto_data JSON error] {e} | first 300: {proto_raw[:300]}")
-            proto_data = {
-                "components": [],
-                "html_prototype": f"<html><body><pre>{proto_raw[:2000]}</pre></body></html>",
-                "implementation_notes": proto_raw[:300],
-            }
-
-        proto_components = proto_data.get("components", [])
-        if not isinstance(proto_components, list):
-            proto_components = []
+class JuniorDesigner(BaseAgent):
+    def __init__(self, client: genai.Client) -> None:
+        super().__init__(AGENT_INDEX, client)
+
+    async def run(
+        self,
+        scope_doc: dict,
+        senior_output: dict,
+        visual_output: dict,
+        emit: EmitFn,
+        manager_addendum: str = "",
+        cross_critique_notes: str = "",
+        on_milestone: MilestoneFn | None = None,
+    ) -> dict:
+        """Two-phase implementation with Manager milestone reviews.
+
+        Phase 1: core React components (the most critical ones from wireframes)
+        Phase 2: remaining components + self-contained HTML prototype
+        Without on_milestone there is no review between them, so both run at once.
+        """
+        # Compact inputs to stay within context budget
+        wireframes = senior_output.get("wireframes", [])[:2]
+        handoff = senior_output.get("handoff_notes", "")[:300]
+        tokens = visual_output.get("design_tokens", {})
+        if not isinstance(tokens, dict):
+            tokens = {}
+        comp_styles = visual_output.get("component_styles", {})
+        if not isinstance(comp_styles, dict):
+            comp_styles = {}
+
+        color_semantic = dig(tokens, 'color', 'semantic', default={}) or {}
+        font_family = dig(tokens, 'typography', 'fontFamily', default={}) or {}
+        spacing_base = dig(tokens, 'spacing', 'base', default='4px') or '4px'
+        if not isinstance(spacing_base, str):
+            spacing_base = '4px'
+
+        if manager_addendum and cross_critique_notes:
+            extra_notes = f"{manager_addendum}\n{cross_critique_notes}"
+        else:
+            extra_notes = manager_addendum or cross_critique_notes
+
+        # Serialised once and shared by both phase prompts
+        in_scope_json = orjson.dumps(scope_doc.get('in_scope', [])).decode()
+
+        all_wireframes = senior_output.get("wireframes", [])
+        proto_fields = {
+            "in_scope": in_scope_json,
+            "project_overview": scope_doc.get('project_overview', ''),
+            "all_wireframes": dump_within(all_wireframes, 1500),
+            "remaining_wireframes": orjson.dumps(all_wireframes[2:4]).decode(),
+            "interaction_specs": preview_json(senior_output.get("interaction_specs", {}), 400),
+            "tokens": preview_json(tokens, 1000),
+        }
+
+        # ── Phase 1: Core components ──────────────────────────────────────────
+        self.emit_status(emit, "working", "Building core React components", 0.1)
+        self.emit_activity(emit, "Reading wireframes, tokens, and Manager brief…")
+
+        core_prompt = _CORE_TMPL.format_map({
+            "in_scope": in_scope_json,
+            "technical_constraints": scope_doc.get('technical_constraints', ''),
+            "manager_notes": extra_notes or "Follow the wireframes and apply all design tokens.",
+            "wireframes": orjson.dumps(wireframes).decode(),
+            "colors": orjson.dumps(color_semantic).decode(),
+            "font_family": font_family,
+            "spacing_base": spacing_base,
+            "component_styles": orjson.dumps(comp_styles).decode(),
+            "handoff": handoff,
+        })
+        proto: JuniorProtoOutput | None = None
+        if on_milestone is None:
+            # No Manager review between the phases, so Phase 2 does not depend
+            # on Phase 1's output — run both LLM calls at once
+            self.emit_activity(emit, "No milestone review — building components and prototype in parallel…")
+            # TaskGroup rather than gather: if one call fails the other is
+            # cancelled instead of streaming on for a run that already failed
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    core_task = tg.create_task(self._build_core(core_prompt, emit))
+                    proto_task = tg.create_task(self._build_prototype(_PROTO_TMPL.format_map({
+                        **proto_fields,
+                        "core_code_summary": "Being built in parallel — build any components the wireframes need.",
+                        "feedback": "No review — follow the wireframes and design tokens.",
+                    }), emit))
+            except ExceptionGroup as eg:
+                # Surface the LLM error itself, as the sequential path would
+                raise eg.exceptions[0]
+            core, proto = core_task.result(), proto_task.result()
+        else:
+            core = await self._build_core(core_prompt, emit)
+
+        core_components = core.components
+        core_count = len(core_components)
+        core_names = [c.name for c in core_components[:3]]
+        self.emit_activity(emit, f"Core components ready: {', '.join(core_names)}.", "success")
+
+        if proto is None:
+            self.emit_status(emit, "working", "Core components done — awaiting Manager review", 0.45)
+
+            # ── Milestone 1: core components review ───────────────────────────
+            summary = (
+                f"{core_count} core component(s): {', '.join(core_names)}. "
+                f"Built from wireframes with full token integration."
+            )
+            feedback_1 = await on_milestone("core_components", summary)
+            if feedback_1:
+                self.emit_activity(emit, f"Manager feedback: {feedback_1[:100]}")
+
+            # ── Phase 2: Remaining components + HTML prototype ────────────────
+            self.emit_status(emit, "working", "Building remaining components & prototype", 0.6)
+            self.emit_activity(emit, "Completing full component set and assembling prototype…")
+
+            # Summarise already-built component code (truncated) for context
+            core_code_summary = "\n".join(
+                [f"// {c.name}.tsx\n{c.tsx_code[:400]}" for c in core_components[:3]]
+            )
+            proto = await self._build_prototype(_PROTO_TMPL.format_map({
+                **proto_fields,
+                "core_code_summary": core_code_summary or "None yet — build all components.",
+                "feedback": feedback_1 or "Core components approved. Maintain the same quality standard.",
+            }), emit)
+
+        proto_components = proto.components
         remaining_count = len(proto_components)
         self.emit_activity(
             emit,
@@ -328,21 +446,21 @@ CRITICAL — html_prototype requirements:
 
         # ── Milestone 2: full component set review ────────────────────────────
         if on_milestone:
-            proto_names = [c.get("name", "") for c in proto_components if isinstance(c, dict)]
-            all_names = core_names + proto_names
+            # Only the first six names make it into the summary
+            all_names = core_names + [c.name for c in proto_components[:6]]
             summary = (
                 f"{core_count + remaining_count} total components: {', '.join(all_names[:6])}. "
                 f"HTML prototype included. "
-                f"Notes: {str(proto_data.get('implementation_notes', ''))[:100]}"
+                f"Notes: {proto.implementation_notes[:100]}"
             )
             await on_milestone("full_implementation", summary)
 
         # Merge all components
-        all_components = core_components + proto_components
+        all_components = [c.model_dump() for c in core_components + proto_components]
         combined = {
             "components": all_components,
-            "html_prototype": proto_data.get("html_prototype", ""),
-            "implementation_notes": proto_data.get("implementation_notes", ""),
+            "html_prototype": proto.html_prototype,
+            "implementation_notes": proto.implementation_notes,
         }
 
         self.emit_status(emit, "complete", "All components and prototype delivered", 1.0, False)
@@ -353,3 +471,104 @@ CRITICAL — html_prototype requirements:
         )
 
         return combined
+
+    async def _build_core(self, prompt: str, emit: EmitFn) -> JuniorCoreOutput:
+        """Run the Phase 1 call and validate it against JuniorCoreOutput.
+
+        call_llm_json re-asks up to CORE_SCHEMA_RETRIES times, with the
+        validation error appended, while the reply is unparseable or off-schema.
+        """
+        _, core = await self.call_llm_json(
+            system=JUNIOR_DESIGNER_SYSTEM,
+            user=prompt,
+            emit=emit,
+            activity_prefix="Building core components",
+            validate=_validate_core,
+            reasks=CORE_SCHEMA_RETRIES,
+            max_tokens=4096,
+            min_tokens=2048,
+        )
+        return core if core is not None else JuniorCoreOutput()
+
+    async def _build_prototype(self, prompt: str, emit: EmitFn) -> JuniorProtoOutput:
+        """Run the Phase 2 call, streaming the HTML prototype to the frontend.
+
+        The html_prototype value is extracted while the LLM writes it and sent
+        as prototype_stream frames of PROTO_FRAME_CHARS, or whatever arrived
+        within PROTO_FRAME_S, so the frontend can show a live preview.
+        """
+        pending: list[str] = []
+        pending_len = 0
+        last_flush = time.monotonic()
+
+        def _flush_html() -> None:
+            nonlocal pending_len, last_flush
+            if pending:
+                emit("prototype_stream", {"delta": "".join(pending)})
+                pending.clear()
+            pending_len = 0
+            last_flush = time.monotonic()
+
+        def _on_html_delta(delta: str) -> None:
+            nonlocal pending_len
+            pending.append(delta)
+            pending_len += len(delta)
+            if pending_len >= PROTO_FRAME_CHARS or time.monotonic() - last_flush >= PROTO_FRAME_S:
+                _flush_html()
+
+        extractor = _HtmlStreamExtractor(_on_html_delta)
+
+        def _restart() -> None:
+            # A retry streams the response again from the top: drop the
+            # partial attempt here and in the frontend's live preview
+            nonlocal pending_len
+            extractor.reset()
+            pending.clear()
+            pending_len = 0
+            emit("prototype_stream", {"delta": "", "reset": True})
+
+        raw = await self.call_llm(
+            system=JUNIOR_DESIGNER_SYSTEM,
+            user=prompt,
+            emit=emit,
+            activity_prefix="Building prototype",
+            max_tokens=12000,
+            min_tokens=8000,
+            on_chunk=extractor.feed,
+            on_retry=_restart,
+            # Framing happens on the extracted HTML above, so feed every fragment
+            chunk_coalesce_bytes=0,
+        )
+        _flush_html()
+
+        data: dict | None = None
+        if extractor.end is not None:
+            # The HTML — the bulk of the response — is already decoded, so
+            # only the remainder of the object needs parsing
+            data = self.parse_json(raw[:extractor.start] + '""' + raw[extractor.end:])
+            if data is not None and _PROTO_KEYS <= data.keys() and data["html_prototype"] == "":
+                data["html_prototype"] = "".join(extractor.html_parts)
+            else:
+                # The splice missed the literal (offsets off): parse it all
+                data = None
+        if data is None:
+            data = self.parse_json(raw)
+
+        if data is not None:
+            try:
+                return JuniorProtoOutput.model_validate(data)
+            except ValidationError as e:
+                log.warning("proto_data schema error: %s", _describe(e)[:300])
+                # Keep the prototype even when the component list is malformed
+                try:
+                    return JuniorProtoOutput.model_validate({**data, "components": []})
+                except ValidationError:
+                    pass
+
+        # Show the response without its markdown fence in the fallback
+        text = strip_fences(raw)
+        log.warning("proto_data unparseable | first 300: %r", text[:300])
+        return JuniorProtoOutput(
+            html_prototype=f"<html><body><pre>{text[:2000]}</pre></body></html>",
+            implementation_notes=text[:300],
+        )
@@ -0,0 +1,93 @@
+"""Adaptive micro-batcher for Manager milestone reviews.
+
+Senior and Visual reach their milestones at roughly the same time while they
+run concurrently. Instead of one LLM round-trip per milestone, reviews that
+arrive within a short window are collected and reviewed in a single call.
+
+Batches are keyed by the emit callback: every node creates its own emit, so
+reviews from different sessions (different scope docs, different SSE queues)
+never share a prompt.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from .base import EmitFn
+
+# How long the first review in a batch waits for company
+BATCH_WINDOW_S = 0.2
+# Flush immediately once this many reviews are pending
+MAX_BATCH_SIZE = 4
+
+
+@dataclass
+class PendingReview:
+    agent_name: str
+    milestone_name: str
+    output_summary: str
+    scope_doc: dict
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+# (pending reviews, emit) -> one result dict per review, in order
+FlushFn = Callable[[list[PendingReview], EmitFn], Awaitable[list[dict]]]
+
+
+class MilestoneBatcher:
+    def __init__(
+        self,
+        flush_fn: FlushFn,
+        window: float = BATCH_WINDOW_S,
+        max_batch: int = MAX_BATCH_SIZE,
+    ) -> None:
+        self._flush_fn = flush_fn
+        self._window = window
+        self._max_batch = max_batch
+        self._pending: dict[EmitFn, list[PendingReview]] = {}
+        self._timers: dict[EmitFn, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        agent_name: str,
+        milestone_name: str,
+        output_summary: str,
+        scope_doc: dict,
+        emit: EmitFn,
+    ) -> dict:
+        """Queue a review and wait for the batch it lands in to be reviewed."""
+        item = PendingReview(agent_name, milestone_name, output_summary, scope_doc)
+        batch = self._pending.setdefault(emit, [])
+        batch.append(item)
+
+        if len(batch) >= self._max_batch:
+            self._flush(emit)
+        elif emit not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[emit] = loop.call_later(self._window, self._flush, emit)
+
+        return await item.future
+
+    def _flush(self, emit: EmitFn) -> None:
+        timer = self._timers.pop(emit, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(emit, [])
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch, emit))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[PendingReview], emit: EmitFn) -> None:
+        try:
+            results = await self._flush_fn(batch, emit)
+        except Exception as exc:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+        for item, result in zip(batch, results):
+            if not item.future.done():
+                item.future.set_result(result)
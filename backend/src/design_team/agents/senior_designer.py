@@ -1,17 +1,158 @@
 from __future__ import annotations
 
-import json
-from typing import Awaitable, Callable
+import asyncio
+import logging
 
+import orjson
 from google import genai
 
-from .base import BaseAgent, EmitFn
+from .base import BaseAgent, EmitFn, MilestoneFn, dump_scope_doc, revision_section, scope_context
 from ..prompts import SENIOR_DESIGNER_SYSTEM
 
+log = logging.getLogger(__name__)
+
 AGENT_INDEX = 1
 
-# Milestone callback: (milestone_name, output_summary) -> feedback string
-MilestoneFn = Callable[[str, str], Awaitable[str]]
+# ── Prompt templates (static skeletons, filled per call via format_map) ─────
+
+# Response shapes, shared by the per-phase prompts and the single-pass prompt
+_FLOWS_SCHEMA = """{
+  "user_flows": [
+    {
+      "id": "flow_01",
+      "title": "string",
+      "steps": ["Step 1", "Step 2", "Step 3"]
+    }
+  ],
+  "ia_map": {
+    "root": {
+      "label": "App",
+      "children": [
+        {"label": "Section", "children": []}
+      ]
+    }
+  }
+}
+"""
+
+_WIREFRAMES_SCHEMA = """{
+  "wireframes": [
+    {
+      "screen_id": "dashboard",
+      "screen_name": "Dashboard",
+      "component_tree": [
+        {"type": "Container", "props": {}, "children": []}
+      ],
+      "layout_props": {"grid": "12-column", "gap": "16px"}
+    }
+  ],
+  "interaction_specs": {
+    "ComponentName": "description of states and transitions"
+  },
+  "handoff_notes": "developer-facing implementation notes"
+}
+"""
+
+_FLOWS_TMPL = """Design the user flows and information architecture.
+
+MANAGER DIRECTION:
+Design approach: {approach}
+Primary journey: {primary_journey}
+Quality priorities: {quality_priorities}
+{revision}
+Return a JSON object:
+{schema}"""
+
+_WIREFRAMES_TMPL = """Build wireframe specifications and interaction design.
+
+USER FLOWS AND IA (already designed):
+{flows}
+
+MANAGER MILESTONE FEEDBACK:
+{feedback}
+{revision}
+Return a JSON object:
+{schema}"""
+
+_SINGLE_PASS_TMPL = """Design the user flows, information architecture and wireframe specifications.
+
+MANAGER DIRECTION:
+Design approach: {approach}
+Primary journey: {primary_journey}
+Quality priorities: {quality_priorities}
+{revision}
+Return ONE JSON object with every key from both shapes below; derive the
+wireframes from the flows you define.
+
+FLOWS AND IA:
+{flows_schema}
+WIREFRAMES AND INTERACTION SPECS:
+{wireframes_schema}"""
+
+_REVIEW_UX_TMPL = """You are a Senior Designer reviewing the Junior Designer's React implementation
+for UX adherence against the scope document above (what was agreed).
+
+JUNIOR DESIGNER'S COMPONENTS (first 4):
+{components}
+
+IMPLEMENTATION NOTES FROM JUNIOR:
+{implementation_notes}
+
+Review for:
+1. UX adherence — do components match the wireframe intent and interaction specs?
+2. Completeness — are all expected components present?
+3. Quality highlights — what was done well?
+4. Issues — specific problems that need attention.
+
+Return JSON:
+{{
+  "ux_adherence_score": 8,
+  "component_issues": ["issue 1", "issue 2"],
+  "positive_highlights": ["highlight 1"],
+  "recommendations": ["recommendation 1"],
+  "overall_assessment": "one paragraph summary"
+}}"""
+
+_REVIEW_TOKENS_TMPL = """You are a Senior Designer checking how the Junior Designer's React implementation
+uses the Visual Designer's design system.
+
+JUNIOR DESIGNER'S COMPONENTS (first 4):
+{components}
+
+VISUAL DESIGNER'S TOKEN CATEGORIES:
+{token_keys}
+
+COMPONENT STYLES DEFINED:
+{component_styles_keys}
+
+Review for:
+1. Token usage — are design tokens applied (no hardcoded color/spacing values visible)?
+2. Coverage — do the defined component styles cover the components that were built?
+
+Return JSON:
+{{
+  "token_usage_score": 7,
+  "token_issues": ["issue 1"],
+  "recommendations": ["recommendation 1"]
+}}"""
+
+
+def _compact_flows(flows_data: dict) -> dict:
+    """The parts of Phase 1 that Phase 2 builds on: each flow's id, title and
+    steps, plus the IA map. Anything else the model added is dropped."""
+    flows = flows_data.get("user_flows")
+    return {
+        "user_flows": [
+            {k: f[k] for k in ("id", "title", "steps") if k in f}
+            for f in (flows if isinstance(flows, list) else [])
+            if isinstance(f, dict)
+        ],
+        "ia_map": flows_data.get("ia_map", {}),
+    }
+
+
+def _as_list(value: object) -> list:
+    return value if isinstance(value, list) else []
 
 
 class SeniorDesigner(BaseAgent):
@@ -24,15 +165,39 @@ class SeniorDesigner(BaseAgent):
         direction_brief: dict,
         emit: EmitFn,
         on_milestone: MilestoneFn | None = None,
+        scope_doc_json: str | None = None,
+        revision_notes: str = "",
     ) -> dict:
         """Two-phase design with Manager milestone reviews.
 
         Phase 1: user flows + information architecture
         Phase 2: wireframes + interaction specs (incorporates milestone feedback)
+
+        scope_doc_json, when given, is the scope doc already serialised by the
+        scoping node and is used instead of dumping scope_doc again.
+        revision_notes is the human's directive on a revision run; every
+        phase's prompt carries it.
         """
         approach = direction_brief.get("design_approach", "")
         primary_journey = direction_brief.get("primary_user_journey", "")
-        quality_priorities = direction_brief.get("quality_priorities", [])
+        priorities = direction_brief.get("quality_priorities") or []
+        # Plain comma list: a Python list repr costs quote/bracket tokens
+        quality_priorities = (
+            ", ".join(map(str, priorities)) if isinstance(priorities, list) else str(priorities)
+        ) or "none"
+        # Sent as call_llm context: both phases share the same cacheable prefix
+        scope_ctx = scope_context(scope_doc_json or dump_scope_doc(scope_doc))
+        revision = revision_section(revision_notes)
+
+        if on_milestone is None:
+            # No Manager review between the phases, so Phase 2 would only see
+            # Phase 1's own output — ask for both in a single call
+            combined = await self._design_single_pass(
+                scope_ctx, approach, primary_journey, quality_priorities, revision, emit
+            )
+            self.emit_status(emit, "complete", "UX deliverables complete", 1.0, False)
+            self.emit_activity(emit, "Flows, IA, wireframes, and interaction specs delivered.", "success")
+            return combined
 
         # ── Phase 1: User flows + IA ──────────────────────────────────────────
         self.emit_status(emit, "working", "Mapping user flows & information architecture", 0.1)
@@ -41,55 +206,32 @@ class SeniorDesigner(BaseAgent):
             f"Primary journey: {primary_journey[:80]}…" if primary_journey else "Mapping user flows…",
         )
 
-        flows_prompt = f"""Design the user flows and information architecture.
-
-SCOPE DOCUMENT:
-{json.dumps(scope_doc, indent=2)}
-
-MANAGER DIRECTION:
-Design approach: {approach}
-Primary journey: {primary_journey}
-Quality priorities: {quality_priorities}
-
-Return a JSON object:
-{{
-  "user_flows": [
-    {{
-      "id": "flow_01",
-      "title": "string",
-      "steps": ["Step 1", "Step 2", "Step 3"]
-    }}
-  ],
-  "ia_map": {{
-    "root": {{
-      "label": "App",
-      "children": [
-        {{"label": "Section", "children": []}}
-      ]
-    }}
-  }}
-}}
-"""
-        flows_raw = await self.call_llm(
+        flows_prompt = _FLOWS_TMPL.format_map({
+            "approach": approach,
+            "primary_journey": primary_journey,
+            "quality_priorities": quality_priorities,
+            "revision": revision,
+            "schema": _FLOWS_SCHEMA,
+        })
+        flows_raw, flows_data = await self.call_llm_json(
             system=SENIOR_DESIGNER_SYSTEM,
             user=flows_prompt,
+            context=scope_ctx,
             emit=emit,
             activity_prefix="Mapping flows",
             max_tokens=3072,
+            min_tokens=1536,
+            stop_at_json_end=True,
         )
 
-        try:
-            flows_data = json.loads(self.clean_json(flows_raw))
-            if not isinstance(flows_data, dict):
-                flows_data = {"user_flows": [], "ia_map": {}}
-        except Exception as e:
-            print(f"[Senior flows JSON error] {e} | first 300: {flows_raw[:300]}")
+        if flows_data is None:
+            log.warning("flows unparseable | first 300: %r", flows_raw[:300])
             flows_data = {"user_flows": [], "ia_map": {}}
 
         flows_count = len(flows_data.get("user_flows", []))
         ia_map_val = flows_data.get('ia_map', {})
         ia_map_keys = list(ia_map_val.keys()) if isinstance(ia_map_val, dict) else []
-        print(f"[Senior] flows_count={flows_count} | ia_map_keys={ia_map_keys} | top_keys={list(flows_data.keys())}")
+        log.debug("flows: %d user flows | ia_map_keys=%s | top_keys=%s", flows_count, ia_map_keys, list(flows_data))
         self.emit_activity(emit, f"{flows_count} user flow(s) and IA map complete.", "success")
         self.emit_status(emit, "working", "User flows done — awaiting Manager review", 0.35)
 
@@ -98,7 +240,7 @@ Return a JSON object:
         if on_milestone:
             summary = (
                 f"{flows_count} user flow(s) covering primary journey '{primary_journey}'. "
-                f"IA map root sections: {ia_map_keys}"
+                f"IA map root sections: {', '.join(map(str, ia_map_keys)) or 'none'}"
             )
             feedback_1 = await on_milestone("user_flows_and_ia", summary)
             if feedback_1:
@@ -108,49 +250,25 @@ Return a JSON object:
         self.emit_status(emit, "working", "Building wireframe specifications", 0.5)
         self.emit_activity(emit, "Translating flows into detailed wireframe JSON…")
 
-        wireframes_prompt = f"""Build wireframe specifications and interaction design.
-
-SCOPE DOCUMENT:
-{json.dumps(scope_doc, indent=2)}
-
-USER FLOWS AND IA (already designed):
-{json.dumps(flows_data, indent=2)}
-
-MANAGER MILESTONE FEEDBACK:
-{feedback_1 if feedback_1 else "No specific feedback — maintain current direction."}
-
-Return a JSON object:
-{{
-  "wireframes": [
-    {{
-      "screen_id": "dashboard",
-      "screen_name": "Dashboard",
-      "component_tree": [
-        {{"type": "Container", "props": {{}}, "children": []}}
-      ],
-      "layout_props": {{"grid": "12-column", "gap": "16px"}}
-    }}
-  ],
-  "interaction_specs": {{
-    "ComponentName": "description of states and transitions"
-  }},
-  "handoff_notes": "developer-facing implementation notes"
-}}
-"""
-        wireframes_raw = await self.call_llm(
+        wireframes_prompt = _WIREFRAMES_TMPL.format_map({
+            "flows": orjson.dumps(_compact_flows(flows_data)).decode(),
+            "feedback": feedback_1 or "No specific feedback — maintain current direction.",
+            "revision": revision,
+            "schema": _WIREFRAMES_SCHEMA,
+        })
+        wireframes_raw, wireframes_data = await self.call_llm_json(
             system=SENIOR_DESIGNER_SYSTEM,
             user=wireframes_prompt,
+            context=scope_ctx,
             emit=emit,
             activity_prefix="Wireframing",
             max_tokens=4096,
+            min_tokens=2048,
+            stop_at_json_end=True,
         )
 
-        try:
-            wireframes_data = json.loads(self.clean_json(wireframes_raw))
-            if not isinstance(wireframes_data, dict):
-                wireframes_data = {"wireframes": [], "interaction_specs": {}, "handoff_notes": ""}
-        except Exception as e:
-            print(f"[Senior wireframes JSON error] {e} | first 300: {wireframes_raw[:300]}")
+        if wireframes_data is None:
+            log.warning("wireframes unparseable | first 300: %r", wireframes_raw[:300])
             wireframes_data = {
                 "wireframes": [],
                 "interaction_specs": {},
@@ -176,12 +294,62 @@ Return a JSON object:
 
         return combined
 
+    async def _design_single_pass(
+        self,
+        scope_ctx: str,
+        approach: str,
+        primary_journey: str,
+        quality_priorities: str,
+        revision: str,
+        emit: EmitFn,
+    ) -> dict:
+        """Flows, IA, wireframes and interaction specs from one LLM call."""
+        self.emit_status(emit, "working", "Mapping flows & wireframing", 0.1)
+        self.emit_activity(emit, "No milestone review — designing flows and wireframes in one pass…")
+
+        raw, data = await self.call_llm_json(
+            system=SENIOR_DESIGNER_SYSTEM,
+            user=_SINGLE_PASS_TMPL.format_map({
+                "approach": approach,
+                "primary_journey": primary_journey,
+                "quality_priorities": quality_priorities,
+                "revision": revision,
+                "flows_schema": _FLOWS_SCHEMA,
+                "wireframes_schema": _WIREFRAMES_SCHEMA,
+            }),
+            context=scope_ctx,
+            emit=emit,
+            activity_prefix="Designing UX",
+            max_tokens=6144,
+            min_tokens=3072,
+            stop_at_json_end=True,
+        )
+
+        if data is None:
+            log.warning("Senior single-pass JSON unparseable: %r", raw[:300])
+            data = {"handoff_notes": raw[:400]}
+        combined = {
+            "user_flows": [],
+            "ia_map": {},
+            "wireframes": [],
+            "interaction_specs": {},
+            "handoff_notes": "",
+            **data,
+        }
+        flows_count = len(combined["user_flows"]) if isinstance(combined["user_flows"], list) else 0
+        screens_count = len(combined["wireframes"]) if isinstance(combined["wireframes"], list) else 0
+        self.emit_activity(
+            emit, f"{flows_count} user flow(s) and {screens_count} screen(s) wireframed.", "success"
+        )
+        return combined
+
     async def review_implementation(
         self,
         junior_output: dict,
         visual_output: dict,
         scope_doc: dict,
         emit: EmitFn,
+        scope_doc_json: str | None = None,
     ) -> dict:
         """Review Junior's component implementation and Visual's token usage.
 
@@ -195,72 +363,56 @@ Return a JSON object:
         if not isinstance(components, list):
             components = []
         comp_summary = [
-            {"name": c.get("name", ""), "code_snippet": c.get("tsx_code", "")[:300]}
+            {"name": c.get("name", ""), "code_snippet": c.get("tsx_code", "")[:300].strip()}
             for c in components[:4]
             if isinstance(c, dict)
         ]
         token_keys = list((visual_output.get("design_tokens") or {}).keys())
         component_styles_keys = list((visual_output.get("component_styles") or {}).keys())
 
-        review_prompt = f"""You are a Senior Designer reviewing the Junior Designer's React implementation
-and the Visual Designer's token usage. Your job is to check UX adherence and design system correctness.
-
-SCOPE DOCUMENT (what was agreed):
-{json.dumps(scope_doc, indent=2)}
-
-JUNIOR DESIGNER'S COMPONENTS (first 4):
-{json.dumps(comp_summary, indent=2)}
-
-VISUAL DESIGNER'S TOKEN CATEGORIES:
-{json.dumps(token_keys, indent=2)}
-
-COMPONENT STYLES DEFINED:
-{json.dumps(component_styles_keys, indent=2)}
-
-IMPLEMENTATION NOTES FROM JUNIOR:
-{junior_output.get("implementation_notes", "")[:400]}
-
-Review for:
-1. UX adherence — do components match the wireframe intent and interaction specs?
-2. Token usage — are design tokens applied (no hardcoded color/spacing values visible)?
-3. Completeness — are all expected components present?
-4. Quality highlights — what was done well?
-5. Issues — specific problems that need attention.
-
-Return JSON:
-{{
-  "ux_adherence_score": 8,
-  "token_usage_score": 7,
-  "component_issues": ["issue 1", "issue 2"],
-  "positive_highlights": ["highlight 1"],
-  "recommendations": ["recommendation 1"],
-  "overall_assessment": "one paragraph summary"
-}}"""
-
-        raw = await self.call_llm(
-            system=SENIOR_DESIGNER_SYSTEM,
-            user=review_prompt,
-            emit=emit,
-            activity_prefix="Reviewing implementation",
-            max_tokens=2048,
+        components_json = orjson.dumps(comp_summary).decode()
+
+        # UX adherence and token hygiene are independent reads of the same
+        # components, so the two halves of the review run concurrently
+        (ux_raw, ux), (_, tokens) = await asyncio.gather(
+            self.call_llm_json(
+                system=SENIOR_DESIGNER_SYSTEM,
+                user=_REVIEW_UX_TMPL.format_map({
+                    "components": components_json,
+                    "implementation_notes": junior_output.get("implementation_notes", "")[:400],
+                }),
+                context=scope_context(scope_doc_json or dump_scope_doc(scope_doc)),
+                emit=emit,
+                activity_prefix="Reviewing implementation",
+                max_tokens=1536,
+                min_tokens=768,
+                stop_at_json_end=True,
+            ),
+            self.call_llm_json(
+                system=SENIOR_DESIGNER_SYSTEM,
+                user=_REVIEW_TOKENS_TMPL.format_map({
+                    "components": components_json,
+                    "token_keys": orjson.dumps(token_keys).decode(),
+                    "component_styles_keys": orjson.dumps(component_styles_keys).decode(),
+                }),
+                emit=emit,
+                activity_prefix="Reviewing token usage",
+                max_tokens=1024,
+                min_tokens=512,
+                stop_at_json_end=True,
+            ),
         )
-
-        try:
-            result = json.loads(self.clean_json(raw))
-            if not isinstance(result, dict):
-                result = {}
-        except Exception:
-            result = {}
-
-        if not result:
-            result = {
-                "ux_adherence_score": None,
-                "token_usage_score": None,
-                "component_issues": [],
-                "positive_highlights": [],
-                "recommendations": [],
-                "overall_assessment": raw[:400],
-            }
+        ux = ux or {"overall_assessment": ux_raw[:400]}
+        tokens = tokens or {}
+
+        result = {
+            "ux_adherence_score": ux.get("ux_adherence_score"),
+            "token_usage_score": tokens.get("token_usage_score"),
+            "component_issues": _as_list(ux.get("component_issues")) + _as_list(tokens.get("token_issues")),
+            "positive_highlights": _as_list(ux.get("positive_highlights")),
+            "recommendations": _as_list(ux.get("recommendations")) + _as_list(tokens.get("recommendations")),
+            "overall_assessment": ux.get("overall_assessment", ""),
+        }
 
         try:
             ux_score = int(result.get("ux_adherence_score", 0))
@@ -276,8 +428,8 @@ Return JSON:
             "success" if ux_score >= 7 else "warn",
         )
 
-        issues = result.get("component_issues", [])
-        if isinstance(issues, list) and issues:
+        issues = result["component_issues"]
+        if issues:
             self.emit_activity(emit, f"Issues found: {'; '.join(str(i) for i in issues[:2])}", "warn")
 
         self.emit_status(emit, "complete", "Implementation review complete", 1.0, False)
@@ -1,16 +1,106 @@
 from __future__ import annotations
 
-import json
-from typing import Awaitable, Callable
+import logging
 
+import orjson
 from google import genai
 
-from .base import BaseAgent, EmitFn
+from .base import BaseAgent, EmitFn, MilestoneFn, dig, dump_scope_doc, revision_section, scope_context
 from ..prompts import VISUAL_DESIGNER_SYSTEM
 
+log = logging.getLogger(__name__)
+
 AGENT_INDEX = 3
 
-MilestoneFn = Callable[[str, str], Awaitable[str]]
+# ── Prompt templates (static skeletons, filled per call via format_map) ─────
+
+_CORE_TOKENS_SCHEMA = """{
+  "color": {
+    "primitive": {
+      "blue": {"50": "#eff6ff", "100": "#dbeafe", "500": "#3b82f6", "900": "#1e3a8a"},
+      "neutral": {"50": "#f9fafb", "100": "#f3f4f6", "900": "#111827"}
+    },
+    "semantic": {
+      "primary": "reference to primitive",
+      "success": "#22c55e",
+      "warning": "#f59e0b",
+      "error": "#ef4444",
+      "background": "#ffffff",
+      "surface": "#f9fafb",
+      "text": {"primary": "#111827", "secondary": "#6b7280"}
+    }
+  },
+  "typography": {
+    "fontFamily": {"sans": "Inter, system-ui, sans-serif", "mono": "JetBrains Mono, monospace"},
+    "fontSize": {"xs": "0.75rem", "sm": "0.875rem", "base": "1rem", "lg": "1.125rem", "xl": "1.25rem", "2xl": "1.5rem", "3xl": "1.875rem"},
+    "fontWeight": {"normal": 400, "medium": 500, "semibold": 600, "bold": 700},
+    "lineHeight": {"tight": 1.25, "snug": 1.375, "normal": 1.5, "relaxed": 1.625}
+  },
+  "spacing": {
+    "base": "4px",
+    "scale": {"1": "4px", "2": "8px", "3": "12px", "4": "16px", "6": "24px", "8": "32px", "12": "48px", "16": "64px"}
+  }
+}
+"""
+
+# Phase 1 needs nothing but the scope doc, which goes in as call_llm context,
+# and a revision directive when there is one
+_CORE_TOKENS_TMPL = """Design the core visual design tokens.
+{revision}
+Return a JSON object with these keys:
+{schema}"""
+
+_SPECS_SCHEMA = """{
+  "elevation": {
+    "none": "none",
+    "sm": "0 1px 2px rgba(0,0,0,0.05)",
+    "md": "0 4px 6px rgba(0,0,0,0.07)",
+    "lg": "0 10px 15px rgba(0,0,0,0.10)",
+    "xl": "0 20px 25px rgba(0,0,0,0.12)"
+  },
+  "border": {
+    "radius": {"none": "0", "sm": "4px", "md": "8px", "lg": "12px", "xl": "16px", "full": "9999px"},
+    "width": {"thin": "1px", "medium": "2px"}
+  },
+  "motion": {
+    "duration": {"fast": "100ms", "normal": "200ms", "slow": "400ms"},
+    "easing": {"default": "cubic-bezier(0.4, 0, 0.2, 1)", "in": "cubic-bezier(0.4, 0, 1, 1)", "out": "cubic-bezier(0, 0, 0.2, 1)"}
+  },
+  "component_styles": {
+    "Button": {"padding": "8px 16px", "borderRadius": "border.radius.md", "fontWeight": "typography.fontWeight.semibold"},
+    "Card": {"padding": "24px", "borderRadius": "border.radius.lg", "shadow": "elevation.md"},
+    "Input": {"height": "40px", "borderRadius": "border.radius.md", "borderColor": "color.semantic.border"}
+  },
+  "figma_specs": {
+    "layout_spec": {"gridColumns": 12, "columnGap": "16px", "rowGap": "16px", "margin": "24px"},
+    "component_spec": {"buttonVariants": ["primary", "secondary", "ghost"], "inputVariants": ["default", "error", "disabled"]},
+    "style_guide": {"primaryColor": "color.semantic.primary", "fontStack": "typography.fontFamily.sans"}
+  }
+}
+"""
+
+# Keys the specs phase owns; everything else in a single-pass reply is a core token
+_SPECS_KEYS = ("elevation", "border", "motion", "component_styles", "figma_specs")
+
+_SPECS_TMPL = """Complete the design system with advanced tokens and Figma specs.
+
+CORE TOKENS (already designed):
+{core_tokens}
+
+MANAGER MILESTONE FEEDBACK:
+{feedback}
+{revision}
+Return a JSON object:
+{schema}"""
+
+_SINGLE_PASS_TMPL = """Design the complete visual design system: core tokens plus advanced tokens and Figma specs.
+{revision}
+Return ONE JSON object with every key from both shapes below.
+
+CORE TOKENS:
+{core_schema}
+ADVANCED TOKENS AND FIGMA SPECS:
+{specs_schema}"""
 
 
 class VisualDesigner(BaseAgent):
@@ -22,85 +112,61 @@ class VisualDesigner(BaseAgent):
         scope_doc: dict,
         emit: EmitFn,
         on_milestone: MilestoneFn | None = None,
+        scope_doc_json: str | None = None,
+        revision_notes: str = "",
     ) -> dict:
         """Two-phase design system work with Manager milestone reviews.
 
         Phase 1: color palette + typography + spacing (the core token set)
         Phase 2: elevation + motion + Figma specs + component styles
+
+        scope_doc_json, when given, is the scope doc already serialised by the
+        scoping node and is used instead of dumping scope_doc again.
+        revision_notes is the human's directive on a revision run; every
+        phase's prompt carries it.
         """
+        # Sent as call_llm context: both phases share the same cacheable prefix
+        scope_ctx = scope_context(scope_doc_json or dump_scope_doc(scope_doc))
+        revision = revision_section(revision_notes)
+
+        if on_milestone is None:
+            # No Manager review between the phases, so Phase 2 would only see
+            # Phase 1's own output — ask for the whole system in a single call
+            combined = _combine(*await self._design_single_pass(scope_ctx, revision, emit))
+            self.emit_status(emit, "complete", "Design system complete", 1.0, False)
+            self.emit_activity(emit, "Full design token set and Figma specs delivered.", "success")
+            return combined
+
         # ── Phase 1: Core tokens ──────────────────────────────────────────────
         self.emit_status(emit, "working", "Defining color palette & typography scale", 0.1)
         self.emit_activity(emit, "Building primitive color palette and type scale…")
 
-        core_prompt = f"""Design the core visual design tokens.
-
-SCOPE DOCUMENT:
-{json.dumps(scope_doc, indent=2)}
-
-Return a JSON object with these keys:
-{{
-  "color": {{
-    "primitive": {{
-      "blue": {{"50": "#eff6ff", "100": "#dbeafe", "500": "#3b82f6", "900": "#1e3a8a"}},
-      "neutral": {{"50": "#f9fafb", "100": "#f3f4f6", "900": "#111827"}}
-    }},
-    "semantic": {{
-      "primary": "reference to primitive",
-      "success": "#22c55e",
-      "warning": "#f59e0b",
-      "error": "#ef4444",
-      "background": "#ffffff",
-      "surface": "#f9fafb",
-      "text": {{"primary": "#111827", "secondary": "#6b7280"}}
-    }}
-  }},
-  "typography": {{
-    "fontFamily": {{"sans": "Inter, system-ui, sans-serif", "mono": "JetBrains Mono, monospace"}},
-    "fontSize": {{"xs": "0.75rem", "sm": "0.875rem", "base": "1rem", "lg": "1.125rem", "xl": "1.25rem", "2xl": "1.5rem", "3xl": "1.875rem"}},
-    "fontWeight": {{"normal": 400, "medium": 500, "semibold": 600, "bold": 700}},
-    "lineHeight": {{"tight": 1.25, "snug": 1.375, "normal": 1.5, "relaxed": 1.625}}
-  }},
-  "spacing": {{
-    "base": "4px",
-    "scale": {{"1": "4px", "2": "8px", "3": "12px", "4": "16px", "6": "24px", "8": "32px", "12": "48px", "16": "64px"}}
-  }}
-}}
-"""
-        core_raw = await self.call_llm(
+        core_raw, core_tokens = await self.call_llm_json(
             system=VISUAL_DESIGNER_SYSTEM,
-            user=core_prompt,
+            user=_CORE_TOKENS_TMPL.format_map({"revision": revision, "schema": _CORE_TOKENS_SCHEMA}),
+            context=scope_ctx,
             emit=emit,
             activity_prefix="Defining tokens",
             max_tokens=3072,
+            min_tokens=1536,
+            stop_at_json_end=True,
         )
 
-        try:
-            core_tokens = json.loads(self.clean_json(core_raw))
-            if not isinstance(core_tokens, dict):
-                core_tokens = {}
-        except Exception as e:
-            print(f"[Visual core_tokens JSON error] {e} | first 300: {core_raw[:300]}")
+        if core_tokens is None:
+            log.warning("core_tokens unparseable | first 300: %r", core_raw[:300])
             core_tokens = {}
 
-        def _dg(obj: object, *keys, default=None):
-            """Safe nested dict accessor — tolerates non-dict intermediate values."""
-            for key in keys:
-                if not isinstance(obj, dict):
-                    return default
-                obj = obj.get(key, default)
-            return obj
-
-        color_obj = _dg(core_tokens, 'color', 'semantic', default={}) or {}
+        color_obj = dig(core_tokens, 'color', 'semantic', default={}) or {}
         color_count = len(color_obj)
-        print(f"[Visual] core_tokens top_keys={list(core_tokens.keys())} | color_count={color_count}")
+        log.debug("core_tokens: %d top-level keys, %d semantic colors", len(core_tokens), color_count)
         self.emit_activity(emit, f"Core tokens ready: {color_count} semantic colors, type scale, spacing.", "success")
         self.emit_status(emit, "working", "Core tokens done — awaiting Manager review", 0.35)
 
         # ── Milestone 1: core tokens review ───────────────────────────────────
         feedback_1 = ""
         if on_milestone:
-            font_sizes = _dg(core_tokens, 'typography', 'fontSize', default={}) or {}
-            spacing_base = _dg(core_tokens, 'spacing', 'base', default='4px') or '4px'
+            font_sizes = dig(core_tokens, 'typography', 'fontSize', default={}) or {}
+            spacing_base = dig(core_tokens, 'spacing', 'base', default='4px') or '4px'
             if not isinstance(spacing_base, str):
                 spacing_base = '4px'
             summary = (
@@ -116,60 +182,25 @@ Return a JSON object with these keys:
         self.emit_status(emit, "working", "Defining elevation, motion & Figma specs", 0.5)
         self.emit_activity(emit, "Adding elevation, motion tokens and generating Figma specs…")
 
-        specs_prompt = f"""Complete the design system with advanced tokens and Figma specs.
-
-SCOPE DOCUMENT:
-{json.dumps(scope_doc, indent=2)}
-
-CORE TOKENS (already designed):
-{json.dumps(core_tokens, indent=2)}
-
-MANAGER MILESTONE FEEDBACK:
-{feedback_1 if feedback_1 else "No specific feedback — maintain current direction."}
-
-Return a JSON object:
-{{
-  "elevation": {{
-    "none": "none",
-    "sm": "0 1px 2px rgba(0,0,0,0.05)",
-    "md": "0 4px 6px rgba(0,0,0,0.07)",
-    "lg": "0 10px 15px rgba(0,0,0,0.10)",
-    "xl": "0 20px 25px rgba(0,0,0,0.12)"
-  }},
-  "border": {{
-    "radius": {{"none": "0", "sm": "4px", "md": "8px", "lg": "12px", "xl": "16px", "full": "9999px"}},
-    "width": {{"thin": "1px", "medium": "2px"}}
-  }},
-  "motion": {{
-    "duration": {{"fast": "100ms", "normal": "200ms", "slow": "400ms"}},
-    "easing": {{"default": "cubic-bezier(0.4, 0, 0.2, 1)", "in": "cubic-bezier(0.4, 0, 1, 1)", "out": "cubic-bezier(0, 0, 0.2, 1)"}}
-  }},
-  "component_styles": {{
-    "Button": {{"padding": "8px 16px", "borderRadius": "border.radius.md", "fontWeight": "typography.fontWeight.semibold"}},
-    "Card": {{"padding": "24px", "borderRadius": "border.radius.lg", "shadow": "elevation.md"}},
-    "Input": {{"height": "40px", "borderRadius": "border.radius.md", "borderColor": "color.semantic.border"}}
-  }},
-  "figma_specs": {{
-    "layout_spec": {{"gridColumns": 12, "columnGap": "16px", "rowGap": "16px", "margin": "24px"}},
-    "component_spec": {{"buttonVariants": ["primary", "secondary", "ghost"], "inputVariants": ["default", "error", "disabled"]}},
-    "style_guide": {{"primaryColor": "color.semantic.primary", "fontStack": "typography.fontFamily.sans"}}
-  }}
-}}
-"""
-        specs_raw = await self.call_llm(
+        specs_prompt = _SPECS_TMPL.format_map({
+            "core_tokens": orjson.dumps(core_tokens).decode(),
+            "feedback": feedback_1 or "No specific feedback — maintain current direction.",
+            "revision": revision,
+            "schema": _SPECS_SCHEMA,
+        })
+        specs_raw, specs_data = await self.call_llm_json(
             system=VISUAL_DESIGNER_SYSTEM,
             user=specs_prompt,
+            context=scope_ctx,
             emit=emit,
             activity_prefix="Building specs",
             max_tokens=3072,
+            min_tokens=1536,
+            stop_at_json_end=True,
         )
 
-        try:
-            specs_data = json.loads(self.clean_json(specs_raw))
-            if not isinstance(specs_data, dict):
-                specs_data = {}
-        except Exception as e:
-            print(f"[Visual specs_data JSON error] {e} | first 300: {specs_raw[:300]}")
+        if specs_data is None:
+            log.warning("specs_data unparseable | first 300: %r", specs_raw[:300])
             specs_data = {}
         if not specs_data:
             specs_data = {"elevation": {}, "border": {}, "motion": {}, "component_styles": {}, "figma_specs": {}}
@@ -190,18 +221,52 @@ Return a JSON object:
             )
             await on_milestone("design_system_complete", summary)
 
-        # Merge all tokens into a unified design_tokens dict
-        combined = {
-            "design_tokens": {
-                **core_tokens,
-                "elevation": specs_data.get("elevation", {}),
-                "border": specs_data.get("border", {}),
-                "motion": specs_data.get("motion", {}),
-            },
-            "component_styles": specs_data.get("component_styles", {}),
-            "figma_specs": specs_data.get("figma_specs", {}),
-        }
+        combined = _combine(core_tokens, specs_data)
         self.emit_status(emit, "complete", "Design system complete", 1.0, False)
         self.emit_activity(emit, "Full design token set and Figma specs delivered.", "success")
 
         return combined
+
+    async def _design_single_pass(self, scope_ctx: str, revision: str, emit: EmitFn) -> tuple[dict, dict]:
+        """Core tokens and specs from one LLM call, split as the two phases return them."""
+        self.emit_status(emit, "working", "Defining tokens & Figma specs", 0.1)
+        self.emit_activity(emit, "No milestone review — building the full design system in one pass…")
+
+        raw, data = await self.call_llm_json(
+            system=VISUAL_DESIGNER_SYSTEM,
+            user=_SINGLE_PASS_TMPL.format_map({
+                "revision": revision,
+                "core_schema": _CORE_TOKENS_SCHEMA,
+                "specs_schema": _SPECS_SCHEMA,
+            }),
+            context=scope_ctx,
+            emit=emit,
+            activity_prefix="Building design system",
+            max_tokens=6144,
+            min_tokens=3072,
+            stop_at_json_end=True,
+        )
+
+        if data is None:
+            log.warning("single-pass design system unparseable | first 300: %r", raw[:300])
+            data = {}
+        core_tokens = {k: v for k, v in data.items() if k not in _SPECS_KEYS}
+        specs_data = {k: data.get(k) or {} for k in _SPECS_KEYS}
+
+        comp_count = len(specs_data["component_styles"])
+        self.emit_activity(emit, f"Design system complete: tokens, {comp_count} component styles, Figma specs.", "success")
+        return core_tokens, specs_data
+
+
+def _combine(core_tokens: dict, specs_data: dict) -> dict:
+    """Merge all tokens into a unified design_tokens dict."""
+    return {
+        "design_tokens": {
+            **core_tokens,
+            "elevation": specs_data.get("elevation", {}),
+            "border": specs_data.get("border", {}),
+            "motion": specs_data.get("motion", {}),
+        },
+        "component_styles": specs_data.get("component_styles", {}),
+        "figma_specs": specs_data.get("figma_specs", {}),
+    }
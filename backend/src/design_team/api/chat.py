@@ -6,14 +6,18 @@ context is available, the agent still responds using its base prompt.
 """
 from __future__ import annotations
 
-import json
-from typing import Literal
+import asyncio
+import logging
+from typing import AsyncIterator, Literal
 
+import orjson
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
 
 from google import genai
 
+from ..agents.client import get_client
 from ..prompts import (
     DESIGN_MANAGER_SYSTEM,
     SENIOR_DESIGNER_SYSTEM,
@@ -21,6 +25,8 @@ from ..prompts import (
     VISUAL_DESIGNER_SYSTEM,
 )
 
+log = logging.getLogger(__name__)
+
 # ── Agent prompt lookup (backend index → system prompt) ──────────────────────
 
 AGENT_PROMPTS: dict[int, str] = {
@@ -45,10 +51,50 @@ AGENT_CONTEXT_KEYS: dict[int, list[str]] = {
     3: ["scope_doc", "direction_brief", "visual_output"],
 }
 
+# Section heading per context key, e.g. "scope_doc" -> "## Scope Doc\n"
+_CONTEXT_HEADERS: dict[str, str] = {
+    key: f"## {key.replace('_', ' ').title()}\n"
+    for keys in AGENT_CONTEXT_KEYS.values()
+    for key in keys
+}
+
+# Every agent's base prompt demands JSON, so non-streaming replies are asked
+# for as {"response": "..."} via structured output instead of being unwrapped
+_REPLY_SCHEMA = {"type": "object", "properties": {"response": {"type": "string"}}, "required": ["response"]}
+
+# Base prompts stripped once at import; every chat prompt ends with the same
+# instruction, so only session context is assembled per request
+_BASE_PROMPTS: dict[int, str] = {i: p.strip() for i, p in AGENT_PROMPTS.items()}
+_CHAT_TAIL = (
+    "\n\n\nKeep responses concise (2-4 sentences). "
+    "Answer from your role's perspective. "
+    "Reference session context when relevant."
+)
+# With context present, steer the agent toward what the session already holds
+_CHAT_TAIL_WITH_CONTEXT = (
+    _CHAT_TAIL
+    + "\nBefore producing new content, reuse facts already present in the "
+    "Current Session Context; only regenerate when the prior output is "
+    "missing or explicitly being revised."
+)
+
+# The whole prompt when there is no session context to add
+_BASE_WITH_TAIL: dict[int, str] = {i: p + _CHAT_TAIL for i, p in _BASE_PROMPTS.items()}
+
+# (session_id, agent_index) -> (checkpoint id it was built from, system prompt)
+_SYSTEM_PROMPTS: dict[tuple[str, int], tuple[str, str]] = {}
+SYSTEM_PROMPT_CACHE_MAXSIZE = 256
+
 import os
 
 MODEL = os.environ.get("GEMINI_CHAT_MODEL", "gemini-2.5-flash")
 
+# Flash latency has a fat tail: past this, a fresh attempt usually beats waiting
+CHAT_TIMEOUT_S = float(os.environ.get("GEMINI_CHAT_TIMEOUT", "20"))
+CHAT_TIMEOUT_RETRIES = 1
+
+_EMPTY_REPLY = "I'm not sure how to respond to that."
+
 
 # ── Request / response models ────────────────────────────────────────────────
 
@@ -72,92 +118,243 @@ class ChatResponse(BaseModel):
 router = APIRouter()
 
 
+class _ContextFull(Exception):
+    """Raised inside _format_truncated once the character budget is spent."""
+
+
+def _format_truncated(val: object, limit: int) -> str:
+    """Compact JSON for val, cut at limit chars (plus "…").
+
+    Walks the structure and stops as soon as the budget is exceeded, so a
+    large session output costs O(limit) rather than a full serialisation.
+    """
+    parts: list[str] = []
+    size = 0
+
+    def put(text: str) -> None:
+        nonlocal size
+        parts.append(text)
+        size += len(text)
+        if size > limit:
+            raise _ContextFull
+
+    def walk(v: object) -> None:
+        if isinstance(v, dict):
+            put("{")
+            sep = ""
+            for k, item in v.items():
+                put(f"{sep}{orjson.dumps(str(k)).decode()}:")
+                walk(item)
+                sep = ","
+            put("}")
+        elif isinstance(v, (list, tuple)):
+            put("[")
+            for i, item in enumerate(v):
+                if i:
+                    put(",")
+                walk(item)
+            put("]")
+        else:
+            if isinstance(v, str):
+                v = v[: limit - size + 1]  # enough to overflow if it doesn't fit
+            put(orjson.dumps(v, default=str).decode())
+
+    try:
+        walk(val)
+    except _ContextFull:
+        return "".join(parts)[:limit] + "…"
+    return "".join(parts)
+
+
 def _build_system_prompt(agent_index: int, session_outputs: dict | None) -> str:
     """Combine the agent's base prompt with session context."""
-    base = AGENT_PROMPTS.get(agent_index)
+    base = _BASE_PROMPTS.get(agent_index)
     if base is None:
         raise ValueError(f"Unknown agent index: {agent_index}")
 
-    parts = [base.strip()]
-
     if session_outputs:
         context_keys = AGENT_CONTEXT_KEYS.get(agent_index, [])
         context_parts = []
         for key in context_keys:
             val = session_outputs.get(key)
             if val:
-                label = key.replace("_", " ").title()
                 try:
-                    formatted = json.dumps(val, indent=2, default=str)[:2000]
+                    formatted = _format_truncated(val, 2000)
                 except Exception:
                     formatted = str(val)[:2000]
-                context_parts.append(f"## {label}\n{formatted}")
+                context_parts.append(_CONTEXT_HEADERS[key] + formatted)
 
         if context_parts:
-            parts.append("\n\n---\n# Current Session Context\n" + "\n\n".join(context_parts))
-
-    parts.append(
-        "\n\nKeep responses concise (2-4 sentences). "
-        "Answer from your role's perspective. "
-        "Reference session context when relevant."
-    )
-
-    return "\n".join(parts)
-
+            return (
+                f"{base}\n\n\n---\n# Current Session Context\n"
+                + "\n\n".join(context_parts)
+                + _CHAT_TAIL_WITH_CONTEXT
+            )
+
+    return _BASE_WITH_TAIL[agent_index]
+
+
+async def _generate_with_timeout(
+    client: genai.Client, contents: list, config: genai.types.GenerateContentConfig
+) -> genai.types.GenerateContentResponse:
+    """generate_content bounded by CHAT_TIMEOUT_S per attempt, retried on timeout."""
+    def attempt():
+        return asyncio.wait_for(
+            client.aio.models.generate_content(model=MODEL, contents=contents, config=config),
+            CHAT_TIMEOUT_S,
+        )
 
-@router.post("/api/sessions/{session_id}/chat", response_model=ChatResponse)
-async def chat_with_agent(session_id: str, body: ChatRequest):
-    """Chat with a specific agent in the context of a session."""
+    for _ in range(CHAT_TIMEOUT_RETRIES):
+        try:
+            return await attempt()
+        except TimeoutError:
+            log.info("chat: generate_content timed out after %.0fs, retrying", CHAT_TIMEOUT_S)
+    return await attempt()
+
+
+async def _stream_with_timeout(
+    client: genai.Client, contents: list, config: genai.types.GenerateContentConfig
+) -> AsyncIterator[str]:
+    """generate_content_stream text, with CHAT_TIMEOUT_S as the limit for the
+    stream to open and between chunks, so a stalled stream can't hold the
+    connection forever.
+
+    A stall before any text is retried like _generate_with_timeout; after
+    that the client has shown a partial reply, so it raises TimeoutError.
+    """
+    retries = CHAT_TIMEOUT_RETRIES
+    started = False
+    while True:
+        try:
+            stream = await asyncio.wait_for(
+                client.aio.models.generate_content_stream(model=MODEL, contents=contents, config=config),
+                CHAT_TIMEOUT_S,
+            )
+            chunks = aiter(stream)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), CHAT_TIMEOUT_S)
+                except StopAsyncIteration:
+                    return
+                if chunk.text:
+                    started = True
+                    yield chunk.text
+        except TimeoutError:
+            if started or not retries:
+                raise
+            retries -= 1
+            log.info("chat: stream stalled for %.0fs before any text, retrying", CHAT_TIMEOUT_S)
+
+
+def _prepare_chat(
+    session_id: str, body: ChatRequest, structured: bool = False
+) -> tuple[list, genai.types.GenerateContentConfig]:
+    """Validate the request and build Gemini contents + config for it.
+
+    structured asks for a {"response": ...} object; otherwise the reply is
+    forced to plain text.
+    """
     from .routes import _manager
 
     if body.agent_index not in AGENT_PROMPTS:
         raise HTTPException(status_code=400, detail=f"Invalid agent_index: {body.agent_index}")
 
-    # Get session outputs for context
-    session_outputs = _manager.get_outputs(session_id)
+    # Rebuild only when the session state has moved on since the last turn;
+    # an unchanged prompt is also what lets Gemini's implicit cache hit
+    version = _manager.get_outputs_version(session_id)
+    key = (session_id, body.agent_index)
+    cached = _SYSTEM_PROMPTS.get(key)
+    if version is not None and cached is not None and cached[0] == version:
+        system_prompt = cached[1]
+    else:
+        system_prompt = _build_system_prompt(body.agent_index, _manager.get_outputs(session_id))
+        if version is not None:
+            if len(_SYSTEM_PROMPTS) >= SYSTEM_PROMPT_CACHE_MAXSIZE:
+                del _SYSTEM_PROMPTS[next(iter(_SYSTEM_PROMPTS))]  # oldest first
+            _SYSTEM_PROMPTS[key] = (version, system_prompt)
+
+    # Build Gemini contents from history + new message; ChatMessage.role is
+    # already constrained to Gemini's own role names
+    contents = [{"role": msg.role, "parts": [{"text": msg.text}]} for msg in body.history]
+    contents.append({"role": "user", "parts": [{"text": body.message}]})
+
+    config = genai.types.GenerateContentConfig(
+        system_instruction=system_prompt,
+        max_output_tokens=1024,
+        temperature=0.7,
+        response_mime_type="application/json" if structured else "text/plain",
+        response_schema=_REPLY_SCHEMA if structured else None,
+    )
+    return contents, config
+
+
+def _unwrap_reply(reply: str) -> str:
+    """Extract plain text from a reply wrapped in JSON outside the schema.
+
+    Streaming stays on text/plain so deltas are displayable, but the JSON-heavy
+    system prompts can still win over the MIME type; /chat also lands here
+    when its structured reply does not decode.
+    """
+    _stripped = reply.strip()
+    if _stripped.startswith("{"):
+        try:
+            _parsed = orjson.loads(_stripped)
+            if isinstance(_parsed, dict):
+                reply = (
+                    _parsed.get("response")
+                    or _parsed.get("reply")
+                    or _parsed.get("text")
+                    or _parsed.get("message")
+                    or reply
+                )
+        except orjson.JSONDecodeError:
+            pass
+    return reply
 
-    system_prompt = _build_system_prompt(body.agent_index, session_outputs)
 
-    # Build Gemini contents from history + new message
-    contents = []
-    for msg in body.history:
-        contents.append({
-            "role": "user" if msg.role == "user" else "model",
-            "parts": [{"text": msg.text}],
-        })
-    contents.append({
-        "role": "user",
-        "parts": [{"text": body.message}],
-    })
+@router.post("/api/sessions/{session_id}/chat", response_model=ChatResponse)
+async def chat_with_agent(session_id: str, body: ChatRequest):
+    """Chat with a specific agent in the context of a session."""
+    contents, config = _prepare_chat(session_id, body, structured=True)
 
     try:
-        client = genai.Client()
-        response = await client.aio.models.generate_content(
-            model=MODEL,
-            contents=contents,
-            config=genai.types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                max_output_tokens=1024,
-                temperature=0.7,
-            ),
-        )
-        reply = response.text or "I'm not sure how to respond to that."
-        # Some agent prompts instruct JSON output; extract plain text if wrapped.
-        _stripped = reply.strip()
-        if _stripped.startswith("{"):
-            try:
-                _parsed = json.loads(_stripped)
-                if isinstance(_parsed, dict):
-                    reply = (
-                        _parsed.get("response")
-                        or _parsed.get("reply")
-                        or _parsed.get("text")
-                        or _parsed.get("message")
-                        or reply
-                    )
-            except json.JSONDecodeError:
-                pass
+        response = await _generate_with_timeout(get_client(), contents, config)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="LLM timed out")
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"LLM error: {exc}")
 
-    return ChatResponse(reply=reply)
+    try:
+        reply = orjson.loads(response.text)["response"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        # Cut off at max_output_tokens, empty, or off-schema: still a reply
+        reply = _unwrap_reply(response.text or "")
+    return ChatResponse(reply=reply or _EMPTY_REPLY)
+
+
+@router.post("/api/sessions/{session_id}/chat/stream")
+async def chat_with_agent_stream(session_id: str, body: ChatRequest):
+    """Streaming variant of chat_with_agent, as SSE.
+
+    Emits chat_delta {text} per streamed fragment, then chat_done {reply} with
+    the complete reply (JSON-unwrapped, as /chat returns it), or chat_error.
+    """
+    contents, config = _prepare_chat(session_id, body)
+    client = get_client()
+
+    async def event_generator():
+        parts: list[str] = []
+        try:
+            async for text in _stream_with_timeout(client, contents, config):
+                parts.append(text)
+                yield {"event": "chat_delta", "data": orjson.dumps({"text": text}).decode()}
+        except TimeoutError:
+            yield {"event": "chat_error", "data": orjson.dumps({"message": "LLM timed out"}).decode()}
+            return
+        except Exception as exc:
+            yield {"event": "chat_error", "data": orjson.dumps({"message": f"LLM error: {exc}"}).decode()}
+            return
+        reply = _unwrap_reply("".join(parts) or _EMPTY_REPLY)
+        yield {"event": "chat_done", "data": orjson.dumps({"reply": reply}).decode()}
+
+    return EventSourceResponse(event_generator())
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import json
-
+import orjson
 from fastapi import APIRouter, HTTPException, Request
 from sse_starlette.sse import EventSourceResponse
 
@@ -52,7 +51,11 @@ async def session_events(session_id: str, request: Request):
             if await request.is_disconnected():
                 break
             # sse-starlette expects dicts with 'event' and 'data' keys
-            yield {"event": event["event"], "data": json.dumps(event["data"])}
+            # NON_STR_KEYS: payloads such as agent_trust are keyed by agent index
+            yield {
+                "event": event["event"],
+                "data": orjson.dumps(event["data"], option=orjson.OPT_NON_STR_KEYS).decode(),
+            }
 
     return EventSourceResponse(event_generator())
 
@@ -0,0 +1,70 @@
+"""Opt-in, content-addressable disk cache for LLM responses.
+
+Set DESIGN_STUDIO_CACHE_DIR to enable it. Each response is stored as
+<cache_dir>/<sha256>.json, keyed by everything that determines the output
+(provider, model, system prompt, user prompt, token ceiling), so re-running a
+session with identical inputs — common while iterating on prompts or the
+frontend — replays from disk instead of calling the model again.
+
+Caching per call rather than per agent run is deliberate: a designer's later
+phases depend on the Manager's milestone feedback, which is itself an LLM call
+through this cache. Re-submitting an unchanged scope doc therefore replays
+every phase and review from disk, while any change reruns only what it affects.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import orjson
+
+CACHE_DIR_ENV = "DESIGN_STUDIO_CACHE_DIR"
+
+
+class PromptCache:
+    def __init__(self, cache_dir: str | os.PathLike) -> None:
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """sha256 over length-prefixed parts, so no two splits of the same
+        bytes (e.g. moving text from system to user) share a key."""
+        h = hashlib.sha256()
+        for part in parts:
+            data = part.encode()
+            h.update(len(data).to_bytes(8, "big"))
+            h.update(data)
+        return h.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        try:
+            return orjson.loads((self.dir / f"{key}.json").read_bytes())["text"]
+        except (OSError, orjson.JSONDecodeError, KeyError, TypeError):
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        path = self.dir / f"{key}.json"
+        # Write-then-rename so a concurrent reader never sees a partial file
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(orjson.dumps({"text": value}))
+        os.replace(tmp, path)
+
+    def delete(self, key: str) -> None:
+        (self.dir / f"{key}.json").unlink(missing_ok=True)
+
+
+_cache: PromptCache | None = None
+
+
+def get_prompt_cache() -> PromptCache | None:
+    """Return the process-wide cache, or None when DESIGN_STUDIO_CACHE_DIR is unset."""
+    global _cache
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    if _cache is None or _cache.dir != Path(cache_dir):
+        _cache = PromptCache(cache_dir)
+    return _cache
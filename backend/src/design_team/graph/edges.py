@@ -26,26 +26,26 @@ def _effective_threshold(agent_trust: dict) -> float:
     return max(0.5, 1.0 - manager_trust * 0.5)
 
 
+def _self_approves(state: DesignTeamState) -> bool:
+    """True when confidence clears the trust threshold and no flag is critical.
+
+    Confidence is compared first so the flag scan only runs when it matters.
+    """
+    if state.get("confidence", 0.5) < _effective_threshold(state.get("agent_trust", {})):
+        return False
+    return not any(f.get("critical") for f in state.get("milestone_flags", []))
+
+
 def should_checkpoint_1(state: DesignTeamState) -> str:
     """Adaptive: skip checkpoint 1 if confidence >= threshold and no critical flags."""
-    flags = state.get("milestone_flags", [])
-    has_critical = any(f.get("critical", False) for f in flags)
-    threshold = _effective_threshold(state.get("agent_trust", {}))
-    confidence = state.get("confidence", 0.5)
-
-    if not has_critical and confidence >= threshold:
+    if _self_approves(state):
         return "implementing"  # self-approve
     return "checkpoint_1"
 
 
 def should_checkpoint_2(state: DesignTeamState) -> str:
     """Adaptive: skip checkpoint 2 if confidence >= threshold and no critical flags."""
-    flags = state.get("milestone_flags", [])
-    has_critical = any(f.get("critical", False) for f in flags)
-    threshold = _effective_threshold(state.get("agent_trust", {}))
-    confidence = state.get("confidence", 0.5)
-
-    if not has_critical and confidence >= threshold:
+    if _self_approves(state):
         return "senior_review"  # self-approve
     return "checkpoint_2"
 
@@ -6,16 +6,58 @@ and wraps it in an EmitFn so existing agent code works unmodified.
 from __future__ import annotations
 
 import asyncio
+from collections import deque
 from typing import Any
 
 from ..agents.base import EmitFn
 
+# Max events buffered for a slow (or disconnected) SSE client
+SSE_QUEUE_MAXSIZE = 256
 
-def make_emit(sse_queue: asyncio.Queue | None) -> EmitFn:
+
+def _is_droppable(event: dict) -> bool:
+    """Info-level activity lines are progress chatter — safe to shed under load."""
+    if event["event"] != "activity":
+        return False
+    data = event["data"]
+    return isinstance(data, dict) and data.get("level", "info") == "info"
+
+
+class SSEQueue(asyncio.Queue):
+    """Bounded SSE queue with backpressure for synchronous emitters.
+
+    Agents emit synchronously, so they cannot await free space. When the
+    queue is full, droppable events are discarded (counted in ``dropped``)
+    and every other event is parked in an overflow deque that refills the
+    queue in order as the consumer drains it — those are never lost.
+    """
+
+    def __init__(self, maxsize: int = SSE_QUEUE_MAXSIZE) -> None:
+        super().__init__(maxsize)
+        self.dropped = 0
+        self._overflow: deque[dict] = deque()
+
+    def put_event(self, event: dict) -> None:
+        if not self._overflow and not self.full():
+            self.put_nowait(event)
+        elif _is_droppable(event):
+            self.dropped += 1
+        else:
+            self._overflow.append(event)
+
+    def get_nowait(self) -> dict:
+        # Queue.get() also returns through here
+        item = super().get_nowait()
+        while self._overflow and not self.full():
+            self.put_nowait(self._overflow.popleft())
+        return item
+
+
+def make_emit(sse_queue: SSEQueue | None) -> EmitFn:
     """Create an emit callback that pushes events to the SSE queue."""
     def emit(event_type: str, payload: dict) -> None:
         if sse_queue is not None:
-            sse_queue.put_nowait({"event": event_type, "data": payload})
+            sse_queue.put_event({"event": event_type, "data": payload})
     return emit
 
 
@@ -6,36 +6,35 @@ from __future__ import annotations
 
 
 def format_scope_doc(doc: dict) -> str:
-    lines: list[str] = []
-    lines.append(f"PROJECT: {doc.get('project_overview', '')}")
-    lines.append(f"\nUSERS: {doc.get('target_users', '')}")
-
-    in_scope = doc.get("in_scope", [])
+    get = doc.get
+    lines: list[str] = [
+        f"PROJECT: {get('project_overview', '')}",
+        f"\nUSERS: {get('target_users', '')}",
+    ]
+    add, extend = lines.append, lines.extend
+
+    in_scope = get("in_scope", [])
     if in_scope:
-        lines.append("\nIN SCOPE:")
-        for item in in_scope:
-            lines.append(f"  \u2022 {item}")
+        add("\nIN SCOPE:")
+        extend(f"  \u2022 {item}" for item in in_scope)
 
-    out_scope = doc.get("out_of_scope", [])
+    out_scope = get("out_of_scope", [])
     if out_scope:
-        lines.append("\nOUT OF SCOPE:")
-        for item in out_scope:
-            lines.append(f"  \u2022 {item}")
+        add("\nOUT OF SCOPE:")
+        extend(f"  \u2022 {item}" for item in out_scope)
 
-    lines.append(f"\nVISUAL DIRECTION: {doc.get('visual_direction', '')}")
-    lines.append(f"\nTECH CONSTRAINTS: {doc.get('technical_constraints', '')}")
+    add(f"\nVISUAL DIRECTION: {get('visual_direction', '')}")
+    add(f"\nTECH CONSTRAINTS: {get('technical_constraints', '')}")
 
-    priorities = doc.get("priority_stack", [])
+    priorities = get("priority_stack", [])
     if priorities:
-        lines.append("\nPRIORITIES:")
-        for i, p in enumerate(priorities, 1):
-            lines.append(f"  {i}. {p}")
+        add("\nPRIORITIES:")
+        extend(f"  {i}. {p}" for i, p in enumerate(priorities, 1))
 
-    questions = doc.get("clarifying_questions", [])
+    questions = get("clarifying_questions", [])
     if questions:
-        lines.append("\nCLARIFYING QUESTIONS:")
-        for q in questions:
-            lines.append(f"  ? {q}")
+        add("\nCLARIFYING QUESTIONS:")
+        extend(f"  ? {q}" for q in questions)
 
     return "\n".join(lines)
 
@@ -52,75 +51,68 @@ def _safe_list(val: object) -> list:
 
 def format_direction_summary(senior: dict, visual: dict, cross: dict) -> str:
     lines: list[str] = []
+    add, extend = lines.append, lines.extend
 
     flows = _safe_list(senior.get("user_flows", []))
-    lines.append(f"USER FLOWS: {len(flows)} flow(s)")
-    for f in flows[:3]:
-        if isinstance(f, dict):
-            lines.append(f"  \u2022 {f.get('title', f.get('id', ''))}")
+    add(f"USER FLOWS: {len(flows)} flow(s)")
+    extend(f"  \u2022 {f.get('title', f.get('id', ''))}" for f in flows[:3] if isinstance(f, dict))
 
     wireframes = _safe_list(senior.get("wireframes", []))
-    lines.append(f"\nWIREFRAMES: {len(wireframes)} screen(s)")
-    for w in wireframes[:3]:
-        if isinstance(w, dict):
-            lines.append(f"  \u2022 {w.get('screen_name', w.get('screen_id', ''))}")
+    add(f"\nWIREFRAMES: {len(wireframes)} screen(s)")
+    extend(
+        f"  \u2022 {w.get('screen_name', w.get('screen_id', ''))}"
+        for w in wireframes[:3] if isinstance(w, dict)
+    )
 
     tokens = _safe_dict(visual.get("design_tokens"))
     color = _safe_dict(tokens.get("color"))
     color_count = len(_safe_dict(color.get("semantic")))
-    lines.append(f"\nDESIGN TOKENS: {color_count} semantic colors, typography, spacing, motion")
+    add(f"\nDESIGN TOKENS: {color_count} semantic colors, typography, spacing, motion")
 
-    comp_styles_val = _safe_dict(visual.get("component_styles"))
-    comp_styles = list(comp_styles_val.keys())
+    comp_styles = _safe_dict(visual.get("component_styles"))
     if comp_styles:
-        lines.append(f"\nCOMPONENT STYLES: {', '.join(comp_styles[:5])}")
+        add(f"\nCOMPONENT STYLES: {', '.join(list(comp_styles)[:5])}")
 
-    score = cross.get("alignment_score", "N/A")
-    summary = cross.get("summary", "")
-    issues = _safe_list(cross.get("alignment_issues", []))
-    lines.append(f"\nCROSS-CRITIQUE: alignment {score}/10 \u2014 {summary}")
-    for issue in issues[:3]:
-        lines.append(f"  \u26a0 {issue}")
+    cross_get = cross.get
+    add(f"\nCROSS-CRITIQUE: alignment {cross_get('alignment_score', 'N/A')}/10 \u2014 {cross_get('summary', '')}")
+    extend(f"  \u26a0 {issue}" for issue in _safe_list(cross_get("alignment_issues", []))[:3])
 
-    lines.append(f"\nHANDOFF NOTES:\n{senior.get('handoff_notes', '')[:250]}")
+    add(f"\nHANDOFF NOTES:\n{senior.get('handoff_notes', '')[:250]}")
     return "\n".join(lines)
 
 
 def format_final_summary(review: dict, junior: dict, cross: dict) -> str:
-    lines: list[str] = []
-    lines.append(f"OVERALL SCORE:        {review.get('overall_score', 'N/A')}/10")
-    lines.append(f"Scope Alignment:      {review.get('scope_alignment', 'N/A')}/10")
-    lines.append(f"Completeness:         {review.get('completeness', 'N/A')}/10")
-    lines.append(f"Coherence:            {review.get('coherence', 'N/A')}/10")
-    lines.append(f"Production Readiness: {review.get('production_readiness', 'N/A')}/10")
-
-    highlights = _safe_list(review.get("highlights", []))
+    get = review.get
+    lines: list[str] = [
+        f"OVERALL SCORE:        {get('overall_score', 'N/A')}/10",
+        f"Scope Alignment:      {get('scope_alignment', 'N/A')}/10",
+        f"Completeness:         {get('completeness', 'N/A')}/10",
+        f"Coherence:            {get('coherence', 'N/A')}/10",
+        f"Production Readiness: {get('production_readiness', 'N/A')}/10",
+    ]
+    add, extend = lines.append, lines.extend
+
+    highlights = _safe_list(get("highlights", []))
     if highlights:
-        lines.append("\nHIGHLIGHTS:")
-        for h in highlights:
-            lines.append(f"  \u2713 {h}")
+        add("\nHIGHLIGHTS:")
+        extend(f"  \u2713 {h}" for h in highlights)
 
-    issues = _safe_list(review.get("issues", []))
+    issues = _safe_list(get("issues", []))
     if issues:
-        lines.append("\nISSUES:")
-        for i in issues:
-            lines.append(f"  \u26a0 {i}")
+        add("\nISSUES:")
+        extend(f"  \u26a0 {i}" for i in issues)
 
-    skill_ev = _safe_dict(review.get("skill_evolution_applied"))
+    skill_ev = _safe_dict(get("skill_evolution_applied"))
     if skill_ev:
-        lines.append("\nSKILL EVOLUTION APPLIED:")
-        for agent, note in skill_ev.items():
-            lines.append(f"  {agent}: {note}")
+        add("\nSKILL EVOLUTION APPLIED:")
+        extend(f"  {agent}: {note}" for agent, note in skill_ev.items())
 
-    lines.append(f"\nSUMMARY:\n{review.get('summary', '')}")
+    add(f"\nSUMMARY:\n{get('summary', '')}")
 
     components = _safe_list(junior.get("components", []))
-    lines.append(f"\nCOMPONENTS BUILT: {len(components)}")
-    for c in components[:6]:
-        if isinstance(c, dict):
-            lines.append(f"  \u2022 {c.get('name', '')}")
+    add(f"\nCOMPONENTS BUILT: {len(components)}")
+    extend(f"  \u2022 {c.get('name', '')}" for c in components[:6] if isinstance(c, dict))
 
-    alignment = cross.get("alignment_score", "N/A")
-    lines.append(f"\nCROSS-CRITIQUE SCORE: {alignment}/10")
+    add(f"\nCROSS-CRITIQUE SCORE: {cross.get('alignment_score', 'N/A')}/10")
 
     return "\n".join(lines)
@@ -9,9 +9,8 @@ in an EmitFn via the emit_bridge module.
 from __future__ import annotations
 
 import asyncio
-import os
+import threading
 
-from google import genai
 from langchain_core.runnables import RunnableConfig
 from langgraph.types import interrupt
 
@@ -19,7 +18,9 @@ from .state import DesignTeamState
 from .emit_bridge import get_emit_from_config
 from .formatting import format_scope_doc, format_direction_summary, format_final_summary
 from ..agents import DesignManager, SeniorDesigner, VisualDesigner, JuniorDesigner
-from ..api.models import ConfirmationOption, ConfirmationPromptPayload
+from ..agents.base import MilestoneFn, dump_scope_doc, gather_or_cancel
+from ..agents.client import get_client
+from ..api.models import ConfirmationOption
 
 
 # ── Confidence constants ─────────────────────────────────────────────────────
@@ -27,25 +28,123 @@ from ..api.models import ConfirmationOption, ConfirmationPromptPayload
 CONFIDENCE_GAIN_APPROVED = 0.10
 CONFIDENCE_LOSS_REVISED = 0.20
 
+# Each designer's last milestone: the agent discards the Manager's feedback
+# on these, so only the flags the review records matter
+_FINAL_MILESTONES = frozenset({"wireframes_complete", "design_system_complete"})
+
 
 # ── Module-level singletons (stateless agents, shared across invocations) ────
 
-_client: genai.Client | None = None
-_manager: DesignManager | None = None
-_senior: SeniorDesigner | None = None
-_visual: VisualDesigner | None = None
-_junior: JuniorDesigner | None = None
+_Agents = tuple[DesignManager, SeniorDesigner, VisualDesigner, JuniorDesigner]
+
+_agents: _Agents | None = None
+_agents_lock = threading.Lock()
+
+
+def _get_agents() -> _Agents:
+    global _agents
+    agents = _agents
+    if agents is None:
+        # Double-checked: the lock is only taken until the first build, and
+        # the tuple is published whole so no caller sees a partial set
+        with _agents_lock:
+            if _agents is None:
+                client = get_client()
+                _agents = (
+                    DesignManager(client),
+                    SeniorDesigner(client),
+                    VisualDesigner(client),
+                    JuniorDesigner(client),
+                )
+            agents = _agents
+    return agents
+
+
+# ── Helper: deferred final milestone reviews ─────────────────────────────────
+
+def _defer_final_review(review: MilestoneFn, pending: list[asyncio.Task]) -> MilestoneFn:
+    """Wrap a milestone callback so an agent's final milestone doesn't block it.
+
+    The final review runs as a task appended to pending, overlapping the
+    other designer's remaining work; the node gathers pending before it
+    returns its milestone_flags.
+    """
+    async def on_milestone(name: str, summary: str) -> str:
+        if name not in _FINAL_MILESTONES:
+            return await review(name, summary)
+        pending.append(asyncio.create_task(review(name, summary)))
+        return ""
+    return on_milestone
+
+
+async def _settle_reviews(pending: list[asyncio.Task]) -> None:
+    """Cancel the deferred reviews still running and wait for all of them.
+
+    Run from the node's finally, so a designer failure or a cancelled node
+    leaves no review task (or unretrieved exception) behind.
+    """
+    for task in pending:
+        if not task.done():
+            task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+# ── Helper: Manager optimization prep ────────────────────────────────────────
+
+# designing_node may leave the ponder task running under this key of the
+# session's config["configurable"]["deferred_tasks"] (runtime-only, like the
+# SSE queue: after a restart the prep falls back to what the state holds)
+_PONDER_KEY = "ponder"
+
+
+def _surface_insights(opt_prep: dict, emit) -> None:
+    opt_notes = opt_prep.get("optimization_notes", "")
+    if opt_notes:
+        emit("activity", {"agentIndex": 0, "message": f"Insight: {opt_notes[:140]}", "level": "info"})
+    risk_areas = opt_prep.get("risk_areas", [])
+    if isinstance(risk_areas, list) and risk_areas:
+        emit("activity", {"agentIndex": 0, "message": f"Risk areas: {', '.join(str(r) for r in risk_areas[:3])}", "level": "warn"})
+    elif isinstance(risk_areas, str) and risk_areas:
+        emit("activity", {"agentIndex": 0, "message": f"Risk areas: {risk_areas[:120]}", "level": "warn"})
+
+
+async def _await_optimization_prep(manager: DesignManager, config: RunnableConfig, emit) -> dict | None:
+    """Resolve the ponder task designing_node deferred, or None if there is none."""
+    task = config.get("configurable", {}).get("deferred_tasks", {}).pop(_PONDER_KEY, None)
+    if task is None:
+        return None
+    opt_prep = await manager.optimization_prep(task, emit)
+    _surface_insights(opt_prep, emit)
+    return opt_prep
+
 
+# ── Helper: confirmation prompt payload ──────────────────────────────────────
 
-def _get_agents() -> tuple[DesignManager, SeniorDesigner, VisualDesigner, JuniorDesigner]:
-    global _client, _manager, _senior, _visual, _junior
-    if _client is None:
-        _client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
-        _manager = DesignManager(_client)
-        _senior = SeniorDesigner(_client)
-        _visual = VisualDesigner(_client)
-        _junior = JuniorDesigner(_client)
-    return _manager, _senior, _visual, _junior  # type: ignore[return-value]
+# Every checkpoint offers the same two options; dumped once at import
+_CHECKPOINT_OPTIONS = [
+    ConfirmationOption(id="confirm", label="Approve & continue", description="").model_dump(),
+    ConfirmationOption(id="revise", label="Request changes", description="").model_dump(),
+]
+
+
+def _confirmation_prompt(prompt_id: str, title: str, question: str, context: str) -> dict:
+    """ConfirmationPromptPayload(...).model_dump() without a pydantic round trip."""
+    return {
+        "id": prompt_id,
+        "title": title,
+        "question": question,
+        "context": context,
+        "options": _CHECKPOINT_OPTIONS,
+    }
+
+
+def _flags_section(flags: list[dict]) -> str:
+    """Checkpoint context lines for milestone flags, joined once ("" if none)."""
+    if not flags:
+        return ""
+    return "\n\nFlags from milestone reviews:" + "".join(
+        f"\n  \u26a0 {f.get('reason', '')}" for f in flags
+    )
 
 
 # ── Helper: process interrupt response ───────────────────────────────────────
@@ -91,7 +190,11 @@ async def scoping_node(state: DesignTeamState, config: RunnableConfig) -> dict:
     scope_doc = await manager.analyze_brief(state["brief"], emit)
 
     emit("design_output", {"output_type": "scope_doc", "data": scope_doc})
-    return {"scope_doc": scope_doc, "current_phase": "scoping"}
+    return {
+        "scope_doc": scope_doc,
+        "scope_doc_json": dump_scope_doc(scope_doc),
+        "current_phase": "scoping",
+    }
 
 
 async def scope_checkpoint_node(state: DesignTeamState, config: RunnableConfig) -> dict:
@@ -103,19 +206,15 @@ async def scope_checkpoint_node(state: DesignTeamState, config: RunnableConfig)
     context = scope_text + f"\n\n\u2500\u2500\u2500 Manager Confidence: {confidence:.0%} \u2500\u2500\u2500"
 
     # Emit confirmation prompt to frontend
-    emit("confirmation_prompt", ConfirmationPromptPayload(
-        id="scope",
+    emit("confirmation_prompt", _confirmation_prompt(
+        prompt_id="scope",
         title="Design Scope Ready",
         question=(
             "I've analyzed your brief and prepared the Design Scope Document. "
             "Does this capture what you need?"
         ),
         context=context,
-        options=[
-            ConfirmationOption(id="confirm", label="Approve & continue", description=""),
-            ConfirmationOption(id="revise", label="Request changes", description=""),
-        ],
-    ).model_dump())
+    ))
 
     # Pause execution — resume value comes from Command(resume={...})
     response = interrupt({"checkpoint_id": "scope", "type": "human_checkpoint"})
@@ -130,7 +229,9 @@ async def kickoff_node(state: DesignTeamState, config: RunnableConfig) -> dict:
     manager, _, _, _ = _get_agents()
     emit = get_emit_from_config(config)
 
-    direction_brief = await manager.kickoff_with_senior(state["scope_doc"], emit)
+    direction_brief = await manager.kickoff_with_senior(
+        state["scope_doc"], emit, scope_doc_json=state.get("scope_doc_json")
+    )
 
     return {"direction_brief": direction_brief}
 
@@ -154,16 +255,12 @@ async def kickoff_micro_checkpoint_node(state: DesignTeamState, config: Runnable
         + f"\n\n\u2500\u2500\u2500 Manager Confidence: {confidence:.0%} \u2500\u2500\u2500"
     )
 
-    emit("confirmation_prompt", ConfirmationPromptPayload(
-        id="kickoff-direction",
+    emit("confirmation_prompt", _confirmation_prompt(
+        prompt_id="kickoff-direction",
         title="Initial Design Direction",
         question=f"Manager briefing: '{summary}' \u2014 Does this direction resonate?",
         context=context,
-        options=[
-            ConfirmationOption(id="confirm", label="Approve & continue", description=""),
-            ConfirmationOption(id="revise", label="Request changes", description=""),
-        ],
-    ).model_dump())
+    ))
 
     response = interrupt({"checkpoint_id": "kickoff-direction", "type": "human_checkpoint"})
     return _process_checkpoint_response(response, confidence, emit)
@@ -199,32 +296,49 @@ async def designing_node(state: DesignTeamState, config: RunnableConfig) -> dict
             milestone_flags.append({"reason": review.get("reason", ""), "critical": False})
         return review.get("feedback", "")
 
-    senior_out, visual_out, opt_prep = await asyncio.gather(
-        senior.run(scope_doc, direction_brief, emit, on_milestone=senior_milestone),
-        visual.run(scope_doc, emit, on_milestone=visual_milestone),
-        manager.ponder_optimizations(scope_doc, emit),
-    )
-
-    # Surface insights
-    opt_notes = opt_prep.get("optimization_notes", "")
-    if opt_notes:
-        emit("activity", {"agentIndex": 0, "message": f"Insight: {opt_notes[:140]}", "level": "info"})
-    risk_areas = opt_prep.get("risk_areas", [])
-    if isinstance(risk_areas, list) and risk_areas:
-        emit("activity", {"agentIndex": 0, "message": f"Risk areas: {', '.join(str(r) for r in risk_areas[:3])}", "level": "warn"})
-    elif isinstance(risk_areas, str) and risk_areas:
-        emit("activity", {"agentIndex": 0, "message": f"Risk areas: {risk_areas[:120]}", "level": "warn"})
+    pending_reviews: list[asyncio.Task] = []
+    try:
+        (senior_out, visual_out), ponder_task = await manager.run_phase(
+            scope_doc,
+            emit,
+            senior.run(
+                scope_doc, direction_brief, emit,
+                on_milestone=_defer_final_review(senior_milestone, pending_reviews),
+                scope_doc_json=state.get("scope_doc_json"),
+            ),
+            visual.run(
+                scope_doc, emit,
+                on_milestone=_defer_final_review(visual_milestone, pending_reviews),
+                scope_doc_json=state.get("scope_doc_json"),
+            ),
+            scope_doc_json=state.get("scope_doc_json"),
+        )
 
-    # Push design outputs to frontend in real-time
-    emit("design_output", {"output_type": "senior_output", "data": senior_out})
-    emit("design_output", {"output_type": "visual_output", "data": visual_out})
+        # Push design outputs to frontend in real-time
+        emit("design_output", {"output_type": "senior_output", "data": senior_out})
+        emit("design_output", {"output_type": "visual_output", "data": visual_out})
+        await asyncio.gather(*pending_reviews)
+    finally:
+        await _settle_reviews(pending_reviews)
 
-    return {
+    update = {
         "senior_output": senior_out,
         "visual_output": visual_out,
-        "optimization_prep": opt_prep,
         "milestone_flags": milestone_flags,
     }
+    deferred = config.get("configurable", {}).get("deferred_tasks")
+    if ponder_task.done() or deferred is None:
+        opt_prep = await manager.optimization_prep(ponder_task, emit)
+        _surface_insights(opt_prep, emit)
+        update["optimization_prep"] = opt_prep
+    else:
+        # Only implementing needs it: let it finish behind cross-critique and
+        # checkpoint 1 rather than holding up Phase 1
+        stale = deferred.pop(_PONDER_KEY, None)
+        if stale is not None:
+            stale.cancel()
+        deferred[_PONDER_KEY] = ponder_task
+    return update
 
 
 # ── Phase 1b: Cross-critique ────────────────────────────────────────────────
@@ -251,25 +365,17 @@ async def checkpoint_1_node(state: DesignTeamState, config: RunnableConfig) -> d
     )
     context = direction_summary + f"\n\n\u2500\u2500\u2500 Manager Confidence: {confidence:.0%} \u2500\u2500\u2500"
 
-    flags = state.get("milestone_flags", [])
-    if flags:
-        context += "\n\nFlags from milestone reviews:"
-        for f in flags:
-            context += f"\n  \u26a0 {f.get('reason', '')}"
+    context += _flags_section(state.get("milestone_flags", []))
 
-    emit("confirmation_prompt", ConfirmationPromptPayload(
-        id="checkpoint-1",
+    emit("confirmation_prompt", _confirmation_prompt(
+        prompt_id="checkpoint-1",
         title="Strategy & Direction Review",
         question=(
             "Senior Designer and Visual Designer have completed Phase 1. "
             "Cross-critique is done. Ready to move to implementation?"
         ),
         context=context,
-        options=[
-            ConfirmationOption(id="confirm", label="Approve & continue", description=""),
-            ConfirmationOption(id="revise", label="Request changes", description=""),
-        ],
-    ).model_dump())
+    ))
 
     response = interrupt({"checkpoint_id": "checkpoint-1", "type": "human_checkpoint"})
     result = _process_checkpoint_response(response, confidence, emit)
@@ -300,7 +406,8 @@ async def implementing_node(state: DesignTeamState, config: RunnableConfig) -> d
             })
         return review.get("feedback", "")
 
-    opt_prep = state.get("optimization_prep", {})
+    pending_prep = await _await_optimization_prep(manager, config, emit)
+    opt_prep = pending_prep if pending_prep is not None else state.get("optimization_prep", {})
     cross = state.get("cross_critique_result", {})
     human_feedback = state.get("human_feedback", "")
 
@@ -318,10 +425,13 @@ async def implementing_node(state: DesignTeamState, config: RunnableConfig) -> d
 
     emit("design_output", {"output_type": "junior_output", "data": junior_out})
 
-    return {
+    update = {
         "junior_output": junior_out,
         "milestone_flags": milestone_flags,
     }
+    if pending_prep is not None:
+        update["optimization_prep"] = pending_prep
+    return update
 
 
 async def checkpoint_2_node(state: DesignTeamState, config: RunnableConfig) -> dict:
@@ -342,25 +452,17 @@ async def checkpoint_2_node(state: DesignTeamState, config: RunnableConfig) -> d
         + f"\n\n\u2500\u2500\u2500 Manager Confidence: {confidence:.0%} \u2500\u2500\u2500"
     )
 
-    flags = state.get("milestone_flags", [])
-    if flags:
-        context += "\n\nFlags from milestone reviews:"
-        for f in flags:
-            context += f"\n  \u26a0 {f.get('reason', '')}"
+    context += _flags_section(state.get("milestone_flags", []))
 
-    emit("confirmation_prompt", ConfirmationPromptPayload(
-        id="checkpoint-2",
+    emit("confirmation_prompt", _confirmation_prompt(
+        prompt_id="checkpoint-2",
         title="Components Review",
         question=(
             f"Junior Designer delivered {comp_count} React component(s) + HTML prototype. "
             "Ready to move to final review?"
         ),
         context=context,
-        options=[
-            ConfirmationOption(id="confirm", label="Approve & continue", description=""),
-            ConfirmationOption(id="revise", label="Request changes", description=""),
-        ],
-    ).model_dump())
+    ))
 
     response = interrupt({"checkpoint_id": "checkpoint-2", "type": "human_checkpoint"})
     result = _process_checkpoint_response(response, confidence, emit)
@@ -381,10 +483,7 @@ async def revision_1_node(state: DesignTeamState, config: RunnableConfig) -> dic
     human_feedback = state.get("human_feedback", "")
     milestone_flags: list[dict] = []
 
-    # Inject revision notes into scope context
-    revised_scope = dict(scope_doc)
     if human_feedback:
-        revised_scope["revision_notes"] = f"Revision directive from human: {human_feedback}"
         emit("activity", {
             "agentIndex": 0,
             "message": f"Revision directive received. Briefing team: {human_feedback[:100]}",
@@ -403,13 +502,29 @@ async def revision_1_node(state: DesignTeamState, config: RunnableConfig) -> dic
             milestone_flags.append({"reason": review.get("reason", ""), "critical": False})
         return review.get("feedback", "")
 
-    senior_out, visual_out = await asyncio.gather(
-        senior.run(revised_scope, direction_brief, emit, on_milestone=senior_milestone),
-        visual.run(revised_scope, emit, on_milestone=visual_milestone),
-    )
+    pending_reviews: list[asyncio.Task] = []
+    try:
+        # Same fail-fast as run_phase: one designer failing cancels the other
+        senior_out, visual_out = await gather_or_cancel(
+            senior.run(
+                scope_doc, direction_brief, emit,
+                on_milestone=_defer_final_review(senior_milestone, pending_reviews),
+                scope_doc_json=state.get("scope_doc_json"),
+                revision_notes=human_feedback,
+            ),
+            visual.run(
+                scope_doc, emit,
+                on_milestone=_defer_final_review(visual_milestone, pending_reviews),
+                scope_doc_json=state.get("scope_doc_json"),
+                revision_notes=human_feedback,
+            ),
+        )
 
-    emit("design_output", {"output_type": "senior_output", "data": senior_out})
-    emit("design_output", {"output_type": "visual_output", "data": visual_out})
+        emit("design_output", {"output_type": "senior_output", "data": senior_out})
+        emit("design_output", {"output_type": "visual_output", "data": visual_out})
+        await asyncio.gather(*pending_reviews)
+    finally:
+        await _settle_reviews(pending_reviews)
 
     return {
         "senior_output": senior_out,
@@ -484,6 +599,7 @@ async def senior_review_node(state: DesignTeamState, config: RunnableConfig) ->
 
     result = await senior.review_implementation(
         state["junior_output"], state["visual_output"], state["scope_doc"], emit,
+        scope_doc_json=state.get("scope_doc_json"),
     )
 
     return {"senior_impl_review": result}
@@ -513,6 +629,7 @@ async def reviewing_node(state: DesignTeamState, config: RunnableConfig) -> dict
         emit,
         optimization_prep=state.get("optimization_prep"),
         senior_impl_review=state.get("senior_impl_review"),
+        scope_doc_json=state.get("scope_doc_json"),
     )
 
     emit("design_output", {"output_type": "review", "data": review})
@@ -530,19 +647,15 @@ async def final_checkpoint_node(state: DesignTeamState, config: RunnableConfig)
     final_summary = format_final_summary(review, junior_out, cross)
     context = final_summary + f"\n\n\u2500\u2500\u2500 Manager Confidence: {confidence:.0%} \u2500\u2500\u2500"
 
-    emit("confirmation_prompt", ConfirmationPromptPayload(
-        id="final",
+    emit("confirmation_prompt", _confirmation_prompt(
+        prompt_id="final",
         title="Final Deliverables Ready",
         question=(
             f"All deliverables complete. Overall quality: {review.get('overall_score', 'N/A')}/10. "
             "This is the final confirmation \u2014 approve to close the project."
         ),
         context=context,
-        options=[
-            ConfirmationOption(id="confirm", label="Approve & continue", description=""),
-            ConfirmationOption(id="revise", label="Request changes", description=""),
-        ],
-    ).model_dump())
+    ))
 
     response = interrupt({"checkpoint_id": "final", "type": "human_checkpoint"})
     return _process_checkpoint_response(response, confidence, emit)
@@ -7,13 +7,15 @@ Key differences from the old implementation:
 - Workflow is a compiled LangGraph StateGraph (not a single async function)
 - Human checkpoints use interrupt() / Command(resume=...) instead of asyncio.Event
 - State is checkpointed to SQLite for persistence
-- SSE events still flow through an asyncio.Queue (unchanged contract)
+- SSE events still flow through an asyncio.Queue (bounded SSEQueue)
 """
 from __future__ import annotations
 
 import asyncio
+import time
 import uuid
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import AsyncGenerator
 
 import os
@@ -22,12 +24,58 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.types import Command
 
+from ..agents.base import llm_cache_scope
 from .builder import build_graph
+from .emit_bridge import SSEQueue
 from .state import DesignTeamState
 
 
 CONFIDENCE_INIT = 0.5
 
+# Defaults for every state key; each session adds its brief and agent_trust.
+# The empty containers are shared between sessions, which is safe because
+# nodes always return fresh objects rather than mutating state in place.
+_INITIAL_STATE = MappingProxyType({
+    "confidence": CONFIDENCE_INIT,
+    "milestone_flags": [],
+    "scope_doc": {},
+    "scope_doc_json": "",
+    "direction_brief": {},
+    "senior_output": {},
+    "visual_output": {},
+    "junior_output": {},
+    "optimization_prep": {},
+    "cross_critique_result": {},
+    "senior_impl_review": {},
+    "review": {},
+    "human_feedback": "",
+    "human_action": "",
+    "current_phase": "scoping",
+    "status": "running",
+})
+
+# Most events stream_events takes off the queue per wakeup
+SSE_DRAIN_BATCH = 32
+
+_TERMINAL_EVENTS = ("session_complete", "session_error")
+
+# A checkpoint is written after every node. In WAL mode (SqliteSaver.setup()
+# would switch to it anyway) synchronous=NORMAL skips the fsync per commit;
+# a power cut can lose the last few checkpoints but never corrupts the file.
+# Finished sessions stay around for late SSE reconnects and output reads.
+# Each create_session drops those finished more than SESSION_TTL_S ago and,
+# while over MAX_SESSIONS, the oldest drained ones (running ones never go)
+MAX_SESSIONS = int(os.environ.get("DESIGN_STUDIO_MAX_SESSIONS", "1024"))
+SESSION_TTL_S = 3600.0
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+)
+
 
 @dataclass
 class LGSessionData:
@@ -35,13 +83,13 @@ class LGSessionData:
     session_id: str
     brief: str
     thread_id: str
-    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    queue: SSEQueue = field(default_factory=SSEQueue)
     task: asyncio.Task | None = None
     status: str = "running"
     agent_trust: dict = field(default_factory=dict)
-    # Internal signaling for human checkpoint bridge
-    _resume_event: asyncio.Event = field(default_factory=asyncio.Event)
-    _resume_data: dict | None = None
+    # Internal signaling for human checkpoint bridge: one single-shot future
+    # per checkpoint, resolved by confirm() with the human's response
+    _resume_future: asyncio.Future | None = None
     # ── Reconnect recovery cache ─────────────────────────────────────────────
     # Updated in real-time as events flow through stream_events().
     # Re-emitted as synthetic events when a new SSE connection opens so that
@@ -49,6 +97,20 @@ class LGSessionData:
     # confirmation prompt — even if those events were consumed by a dead connection.
     _current_phase: str = "scoping"
     _last_confirmation_prompt: dict | None = None
+    # Graph state after the latest completed step, mirrored by _run_graph so
+    # get_outputs() needn't deserialise the checkpoint
+    _latest_state: dict = field(default_factory=dict)
+    # time.monotonic() when the run completed or failed; None while live
+    _finished_at: float | None = None
+    # Tasks a node left running for a later node to collect, handed to the
+    # graph as config["configurable"]["deferred_tasks"] (runtime-only, like
+    # the queue). Cancelled once the run ends or the session is dropped
+    _deferred_tasks: dict[str, asyncio.Task] = field(default_factory=dict)
+
+    def cancel_deferred(self) -> None:
+        for task in self._deferred_tasks.values():
+            task.cancel()
+        self._deferred_tasks.clear()
 
 
 class LangGraphSessionManager:
@@ -64,6 +126,8 @@ class LangGraphSessionManager:
             path = db_path or os.environ.get("LANGGRAPH_DB", "data/sessions.sqlite")
             import sqlite3
             conn = sqlite3.connect(path, check_same_thread=False)
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
             self._checkpointer = SqliteSaver(conn)
         else:
             self._checkpointer = MemorySaver()
@@ -87,15 +151,30 @@ class LangGraphSessionManager:
             thread_id=thread_id,
             agent_trust=trust,
         )
+        self._evict_finished()
         self._sessions[session_id] = data
         data.task = asyncio.create_task(self._run_graph(data))
         return session_id
 
+    def _evict_finished(self) -> None:
+        """Drop expired finished sessions, and the oldest ones past MAX_SESSIONS."""
+        now = time.monotonic()
+        excess = len(self._sessions) + 1 - MAX_SESSIONS  # room for the new one
+        for sid, s in list(self._sessions.items()):  # insertion order: oldest first
+            if s._finished_at is None:
+                continue
+            # Under pressure only sessions whose events were all delivered go
+            if now - s._finished_at > SESSION_TTL_S or (excess > 0 and s.queue.empty()):
+                s.cancel_deferred()
+                del self._sessions[sid]
+                excess -= 1
+
     async def confirm(self, session_id: str, action: str, feedback: str | None = None) -> bool:
         data = self._sessions.get(session_id)
         if data is None or data.status != "awaiting_confirm":
             return False
-        data._resume_data = {"action": action, "feedback": feedback or ""}
+        if data._resume_future is None or data._resume_future.done():
+            return False
         data.status = "running"
         # Clear cached prompt immediately so reconnecting clients don't see a
         # stale confirmation_prompt after the user has already confirmed.
@@ -103,8 +182,8 @@ class LangGraphSessionManager:
         # Also push a confirmation_cleared event so any already-connected client
         # (or a client that reconnects before phase_change arrives) clears the
         # pending confirmation UI straight away.
-        data.queue.put_nowait({"event": "confirmation_cleared", "data": {}})
-        data._resume_event.set()
+        data.queue.put_event({"event": "confirmation_cleared", "data": {}})
+        data._resume_future.set_result({"action": action, "feedback": feedback or ""})
         return True
 
     async def stream_events(self, session_id: str) -> AsyncGenerator[dict, None]:
@@ -130,10 +209,21 @@ class LangGraphSessionManager:
             yield {"event": "confirmation_prompt", "data": data._last_confirmation_prompt}
 
         # ── Normal queue drain ────────────────────────────────────────────────
+        # One timed wait per wakeup, then whatever is already queued is taken
+        # synchronously — bursts of activity events don't each pay a wait_for
+        queue = data.queue
         while True:
             try:
-                event = await asyncio.wait_for(data.queue.get(), timeout=30.0)
+                batch = [await asyncio.wait_for(queue.get(), timeout=30.0)]
+            except asyncio.TimeoutError:
+                yield {"event": "ping", "data": {}}
+                continue
+            while len(batch) < SSE_DRAIN_BATCH and not queue.empty():
+                if batch[-1]["event"] in _TERMINAL_EVENTS:
+                    break
+                batch.append(queue.get_nowait())
 
+            for event in batch:
                 # Update in-memory cache so future reconnects get fresh values
                 if event["event"] == "phase_change":
                     phase = event["data"]
@@ -145,11 +235,9 @@ class LangGraphSessionManager:
                         data._last_confirmation_prompt = prompt
 
                 yield event
-                data.queue.task_done()
-                if event["event"] in ("session_complete", "session_error"):
-                    break
-            except asyncio.TimeoutError:
-                yield {"event": "ping", "data": {}}
+                queue.task_done()
+                if event["event"] in _TERMINAL_EVENTS:
+                    return
 
     def list_sessions(self) -> list[dict]:
         return [
@@ -192,86 +280,107 @@ class LangGraphSessionManager:
         }
 
     def get_outputs(self, session_id: str) -> dict | None:
-        """Read outputs from the latest LangGraph checkpoint state."""
+        """Outputs from the latest graph state (in-memory mirror, else checkpoint)."""
         data = self._sessions.get(session_id)
         if data is None:
             return None
+        if data._latest_state:
+            return _outputs_from_state(data._latest_state)
 
         config = {"configurable": {"thread_id": data.thread_id}}
         try:
             snapshot = self._graph.get_state(config)
-            state = snapshot.values
-            return {
-                "scope_doc": state.get("scope_doc", {}),
-                "direction_brief": state.get("direction_brief", {}),
-                "senior_output": state.get("senior_output", {}),
-                "visual_output": state.get("visual_output", {}),
-                "junior_output": state.get("junior_output", {}),
-                "optimization_prep": state.get("optimization_prep", {}),
-                "cross_critique": state.get("cross_critique_result", {}),
-                "senior_impl_review": state.get("senior_impl_review", {}),
-                "review": state.get("review", {}),
-            }
+            return _outputs_from_state(snapshot.values)
         except Exception:
             return {}
 
+    def get_outputs_version(self, session_id: str) -> str | None:
+        """Id of the latest checkpoint; changes whenever get_outputs() could.
+
+        Reads only the checkpoint tuple, so it is much cheaper than get_outputs.
+        """
+        data = self._sessions.get(session_id)
+        if data is None:
+            return None
+        try:
+            latest = self._checkpointer.get_tuple({"configurable": {"thread_id": data.thread_id}})
+        except Exception:
+            return None
+        return latest.config["configurable"].get("checkpoint_id") if latest else None
+
     # ── Internal: run graph with interrupt handling ──────────────────────────
 
+    async def _step_graph(self, data: LGSessionData, graph_input: object, config: dict) -> dict:
+        """Run the graph until it interrupts or ends; returns the last state.
+
+        Streams full state values (the same thing ainvoke returns, but after
+        every node) so data._latest_state stays current for get_outputs().
+        """
+        result: dict = {}
+        async for result in self._graph.astream(graph_input, config, stream_mode="values"):
+            data._latest_state = result
+        return result
+
     async def _run_graph(self, data: LGSessionData) -> None:
         """Execute the LangGraph, bridging interrupt() to human confirmations."""
+        # This task's own context: every node, and every LLM call it makes, sees it
+        llm_cache_scope.set(data.thread_id)
         try:
             initial_state: DesignTeamState = {
+                **_INITIAL_STATE,
                 "brief": data.brief,
                 "agent_trust": data.agent_trust,
-                "confidence": CONFIDENCE_INIT,
-                "milestone_flags": [],
-                "scope_doc": {},
-                "direction_brief": {},
-                "senior_output": {},
-                "visual_output": {},
-                "junior_output": {},
-                "optimization_prep": {},
-                "cross_critique_result": {},
-                "senior_impl_review": {},
-                "review": {},
-                "human_feedback": "",
-                "human_action": "",
-                "current_phase": "scoping",
-                "status": "running",
             }
 
             config = {
                 "configurable": {
                     "thread_id": data.thread_id,
                     "sse_queue": data.queue,  # runtime-only, not checkpointed
+                    "deferred_tasks": data._deferred_tasks,
                 }
             }
 
             # First invocation — runs until first interrupt()
-            await self._graph.ainvoke(initial_state, config)
+            result = await self._step_graph(data, initial_state, config)
 
             # Loop: check if graph is interrupted, wait for human, resume
             while True:
-                snapshot = await self._graph.aget_state(config)
-
-                if not snapshot.next:
-                    # Graph finished (no more nodes to run)
-                    break
+                # The last streamed state carries the pending interrupt, so a human
+                # turn costs no checkpoint read; only a run that looks done is
+                # confirmed against the stored state
+                if "__interrupt__" not in result:
+                    snapshot = await self._graph.aget_state(config)
+                    if not snapshot.next:
+                        # Graph finished (no more nodes to run)
+                        break
 
                 # Graph is interrupted — wait for human confirmation
+                data._resume_future = asyncio.get_running_loop().create_future()
                 data.status = "awaiting_confirm"
-                data._resume_event.clear()
-                await data._resume_event.wait()
 
                 # Resume the graph with the human's response
-                resume_data = data._resume_data or {"action": "confirm", "feedback": ""}
-                await self._graph.ainvoke(
-                    Command(resume=resume_data),
-                    config,
-                )
+                resume_data = await data._resume_future
+                result = await self._step_graph(data, Command(resume=resume_data), config)
 
             data.status = "complete"
 
         except Exception as exc:
             data.status = "error"
-            data.queue.put_nowait({"event": "session_error", "data": {"message": str(exc)}})
+            data.queue.put_event({"event": "session_error", "data": {"message": str(exc)}})
+        finally:
+            data.cancel_deferred()
+            data._finished_at = time.monotonic()
+
+
+def _outputs_from_state(state: dict) -> dict:
+    return {
+        "scope_doc": state.get("scope_doc", {}),
+        "direction_brief": state.get("direction_brief", {}),
+        "senior_output": state.get("senior_output", {}),
+        "visual_output": state.get("visual_output", {}),
+        "junior_output": state.get("junior_output", {}),
+        "optimization_prep": state.get("optimization_prep", {}),
+        "cross_critique": state.get("cross_critique_result", {}),
+        "senior_impl_review": state.get("senior_impl_review", {}),
+        "review": state.get("review", {}),
+    }
@@ -20,6 +20,7 @@ class DesignTeamState(TypedDict, total=False):
 
     # ── Phase outputs (accumulated by nodes) ───────────────────────
     scope_doc: dict
+    scope_doc_json: str             # scope_doc serialized once for prompt reuse
     direction_brief: dict
     senior_output: dict
     visual_output: dict
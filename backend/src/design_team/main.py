@@ -1,19 +1,50 @@
 """FastAPI application entry point."""
 from __future__ import annotations
 
+import logging
+import logging.handlers
+import os
+import queue
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
 
+# Records are formatted and written on a listener thread, so a log call from an
+# agent never blocks the event loop on stderr
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+_log_enqueue = logging.handlers.QueueHandler(_log_queue)
+# QueueHandler pre-formats msg; keep it bare so the listener's format applies once
+_log_enqueue.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    handlers=[_log_enqueue],
+)
+_log_listener.start()
+
 from .api.routes import router  # noqa: E402 (import after load_dotenv)
 from .api.chat import router as chat_router  # noqa: E402
+from .agents.client import aclose_client  # noqa: E402
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await aclose_client()
+    _log_listener.stop()  # flushes queued records
+
 
 app = FastAPI(
     title="AI Design Studio API",
     description="Multi-agent design team orchestration backend",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Allow the Vite dev server to talk to us
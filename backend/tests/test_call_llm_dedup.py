@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from design_team.agents.base import BaseAgent, llm_cache_scope
+
+
+class _SlowAgent(BaseAgent):
+    """BaseAgent whose stream is a controllable sleep instead of a Gemini call."""
+
+    def __init__(self) -> None:
+        super().__init__(0, client=None)
+        self.calls = 0
+
+    async def _stream_llm(self, *args, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return "reply"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_owner_does_not_cancel_waiter():
+    agent = _SlowAgent()
+    emit = lambda *_: None
+
+    owner = asyncio.create_task(agent.call_llm("sys", "user", emit))
+    await asyncio.sleep(0)  # owner registers the in-flight entry
+    waiter = asyncio.create_task(agent.call_llm("sys", "user", emit))
+    await asyncio.sleep(0)  # waiter attaches to it
+
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+    assert await waiter == "reply"
+    assert not waiter.cancelled()
+    assert agent.calls == 2  # the waiter re-issued the call itself
+
+
+@pytest.mark.asyncio
+async def test_runs_do_not_share_responses():
+    agent = _SlowAgent()
+    emit = lambda *_: None
+
+    async def call_in_run(run_id: str) -> str:
+        llm_cache_scope.set(run_id)  # a task's context is its own copy
+        return await agent.call_llm("sys", "user", emit)
+
+    await asyncio.gather(
+        asyncio.create_task(call_in_run("thread_a")),
+        asyncio.create_task(call_in_run("thread_a")),
+    )
+    assert agent.calls == 1  # same run: deduplicated
+
+    await asyncio.create_task(call_in_run("thread_b"))
+    assert agent.calls == 2  # another run issues its own request
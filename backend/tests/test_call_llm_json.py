@@ -0,0 +1,49 @@
+import pytest
+
+from design_team.agents.base import BaseAgent
+from design_team.cache import CACHE_DIR_ENV
+
+
+class _ScriptedAgent(BaseAgent):
+    """BaseAgent that answers from a list of canned replies, recording prompts."""
+
+    def __init__(self, replies: list[str]) -> None:
+        super().__init__(0, client=None)
+        self.replies = replies
+        self.prompts: list[str] = []
+
+    async def _stream_llm(self, system, context, user, *args, **kwargs) -> str:
+        self.prompts.append(user)
+        return self.replies[len(self.prompts) - 1]
+
+
+def _needs_name(data: dict) -> str:
+    if "name" not in data:
+        raise ValueError("name: field required")
+    return data["name"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_reply_is_reasked_and_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    agent = _ScriptedAgent(['{"title": "x"}', '{"name": "ok"}', '{"name": "fresh"}'])
+    emit = lambda *_: None
+
+    raw, result = await agent.call_llm_json("sys", "user", emit, validate=_needs_name)
+    assert result == "ok"
+    assert "name: field required" in agent.prompts[1]
+
+    # The off-schema reply was dropped from both caches: the same prompt
+    # goes back to the model instead of replaying it
+    _, result = await agent.call_llm_json("sys", "user", emit, validate=_needs_name)
+    assert result == "fresh"
+    assert agent.prompts[2] == "user"
+    assert len(list(tmp_path.glob("*.json"))) == 2  # the two accepted replies
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_reasks():
+    agent = _ScriptedAgent(["no json here", '{"title": "x"}', '{"title": "y"}'])
+    _, result = await agent.call_llm_json("sys", "user", lambda *_: None, validate=_needs_name, reasks=2)
+    assert result is None
+    assert len(agent.prompts) == 3
@@ -0,0 +1,42 @@
+import asyncio
+
+from design_team.agents.junior_designer import JuniorDesigner
+
+_REPLY = '{"components": [], "html_prototype": "<p>\\"hi\\"</p>", "implementation_notes": "notes"}'
+
+
+class _ScriptedJunior(JuniorDesigner):
+    """JuniorDesigner whose stream replays scripted attempts instead of calling Gemini."""
+
+    def __init__(self, attempts: list[list[str]]) -> None:
+        super().__init__(client=None)
+        self.attempts = attempts
+
+    async def _stream_llm(self, *args, on_chunk, on_retry, **kwargs) -> str:
+        for i, chunks in enumerate(self.attempts):
+            if i:
+                on_retry()
+            for chunk in chunks:
+                on_chunk(chunk)
+        return "".join(self.attempts[-1]).strip()
+
+
+def _build(attempts: list[list[str]]):
+    events: list[tuple[str, dict]] = []
+    agent = _ScriptedJunior(attempts)
+    out = asyncio.run(agent._build_prototype("prompt", lambda t, p: events.append((t, p))))
+    return out, events
+
+
+def test_leading_whitespace_keeps_other_fields():
+    out, _ = _build([["\n\n  ", _REPLY[:40], _REPLY[40:]]])
+    assert out.html_prototype == '<p>"hi"</p>'
+    assert out.implementation_notes == "notes"
+
+
+def test_retry_resets_live_preview():
+    out, events = _build([[_REPLY[:45]], [_REPLY]])
+    frames = [p for t, p in events if t == "prototype_stream"]
+    assert {"delta": "", "reset": True} in frames
+    assert out.html_prototype == '<p>"hi"</p>'
+    assert out.implementation_notes == "notes"
@@ -62,8 +62,9 @@ export function useSSEStream(sessionId: string | null): void {
       });
 
       es.addEventListener('prototype_stream', (e: MessageEvent) => {
-        const { delta } = JSON.parse(e.data) as { delta: string };
-        useStore.getState()._appendStreamingPrototype(delta);
+        // reset: the backend retried the call and is streaming it from the start
+        const { delta, reset } = JSON.parse(e.data) as { delta: string; reset?: boolean };
+        useStore.getState()._appendStreamingPrototype(delta, reset);
         attemptsRef.current = 0;
       });
 
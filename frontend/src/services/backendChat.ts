@@ -0,0 +1,51 @@
+import { ChatMessage } from "../playground/types";
+
+export interface BackendChatRequest {
+  agent_index: number;
+  message: string;
+  history: Pick<ChatMessage, "role" | "text">[];
+}
+
+/**
+ * Chat with a session agent over /chat/stream (SSE over a POST, so it is read
+ * with fetch rather than EventSource). onDelta receives the reply as it
+ * streams; the promise resolves with the final reply from chat_done, which
+ * the backend has already unwrapped if the model answered in JSON.
+ */
+export async function streamBackendChat(
+  sessionId: string,
+  body: BackendChatRequest,
+  onDelta: (text: string) => void,
+): Promise<string> {
+  const res = await fetch(`/api/sessions/${sessionId}/chat/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  if (!res.ok || !res.body) throw new Error(`Chat API error: ${res.status}`);
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += value;
+    // sse-starlette separates events with a blank line (CRLF line endings)
+    const frames = buffer.split(/\r?\n\r?\n/);
+    buffer = frames.pop() ?? "";
+    for (const frame of frames) {
+      let event = "message";
+      const data: string[] = [];
+      for (const line of frame.split(/\r?\n/)) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+      }
+      if (!data.length) continue;
+      const payload = JSON.parse(data.join("\n"));
+      if (event === "chat_delta") onDelta(payload.text);
+      else if (event === "chat_done") return payload.reply;
+      else if (event === "chat_error") throw new Error(payload.message);
+    }
+  }
+  throw new Error("Chat stream ended without a reply");
+}
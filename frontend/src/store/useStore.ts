@@ -84,7 +84,7 @@ interface StudioStore {
   _setComplete: () => void;
   _setSessionError: (message: string) => void;
   _handleDesignOutput: (payload: { output_type: string; data: Record<string, unknown> }) => void;
-  _appendStreamingPrototype: (delta: string) => void;
+  _appendStreamingPrototype: (delta: string, reset?: boolean) => void;
 }
 
 // ── Store ─────────────────────────────────────────────────────────────────────
@@ -146,8 +146,8 @@ export const useStore = create<StudioStore>()((set, get) => ({
     );
   },
 
-  _appendStreamingPrototype: (delta) =>
-    set((s) => ({ streamingPrototype: s.streamingPrototype + delta })),
+  _appendStreamingPrototype: (delta, reset) =>
+    set((s) => ({ streamingPrototype: reset ? delta : s.streamingPrototype + delta })),
 
   _handleDesignOutput: ({ output_type, data }) =>
     set((s) => ({
@@ -8,6 +8,7 @@ import { AGENTS, PLAYER_INDEX } from '../../playground/agents';
 import { usePlaygroundStore } from '../../playground/store';
 import { AgentBehavior, ChatMessage } from '../../playground/types';
 import { playgroundGemini } from '../../services/playgroundGemini';
+import { streamBackendChat } from '../../services/backendChat';
 import { useStore } from '../../store/useStore';
 import * as THREE from 'three/webgpu';
 import { FormationController } from './behavior/FormationController';
@@ -187,23 +188,37 @@ export class PlaygroundScene {
           const sessionId = useStore.getState().sessionId;
           const backendIdx = toBackendAgentIndex(state.selectedNpcIndex);
 
-          let responseText: string;
+          const replyTimestamp = new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+          let replyShown = false;
+          // The first call adds the reply bubble, later ones rewrite it in place
+          const showReply = (replyText: string) => {
+            const modelMessage: ChatMessage = { role: 'model', text: replyText, timestamp: replyTimestamp };
+            usePlaygroundStore.setState((s) => ({
+              chatMessages: replyShown
+                ? [...s.chatMessages.slice(0, -1), modelMessage]
+                : [...s.chatMessages, modelMessage],
+            }));
+            replyShown = true;
+          };
 
           if (sessionId && backendIdx !== null) {
-            // Dual-mode: backend chat with session context
+            // Dual-mode: backend chat with session context, streamed into the
+            // bubble; isThinking stays set (input locked) until chat_done
             const history = usePlaygroundStore.getState().chatMessages.slice(0, -1);
-            const res = await fetch(`/api/sessions/${sessionId}/chat`, {
-              method: 'POST',
-              headers: { 'Content-Type': 'application/json' },
-              body: JSON.stringify({
+            let streamed = '';
+            const reply = await streamBackendChat(
+              sessionId,
+              {
                 agent_index: backendIdx,
                 message: text,
                 history: history.map(m => ({ role: m.role, text: m.text })),
-              }),
-            });
-            if (!res.ok) throw new Error(`Chat API error: ${res.status}`);
-            const data = await res.json();
-            responseText = data.reply;
+              },
+              (delta) => {
+                streamed += delta;
+                showReply(streamed);
+              },
+            );
+            showReply(reply);
           } else {
             // Fallback: client-side Gemini (no session or CEO)
             const systemInstruction = `You are ${agent.role} at the AI Design Studio.
@@ -214,23 +229,14 @@ Expertise: ${agent.expertise.join(', ')}
 
 Keep your responses extremely brief (1-2 short sentences max) and professional, matching your corporate persona.`;
 
-            responseText = await playgroundGemini.chat(
+            showReply(await playgroundGemini.chat(
               systemInstruction,
               usePlaygroundStore.getState().chatMessages.slice(0, -1),
               text
-            );
+            ));
           }
 
-          const modelMessage: ChatMessage = {
-            role: 'model',
-            text: responseText,
-            timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
-          };
-
-          usePlaygroundStore.setState((s) => ({
-            chatMessages: [...s.chatMessages, modelMessage],
-            isThinking: false
-          }));
+          usePlaygroundStore.setState({ isThinking: false });
 
           this.characters.fadeToAction('Wave');
           setTimeout(() => this.characters.fadeToAction('Idle'), 2000);
@@ -479,21 +485,28 @@ Keep your responses extremely brief (1-2 short sentences max) and professional,
       const sessionId = useStore.getState().sessionId;
       const backendIdx = toBackendAgentIndex(npcIndex);
 
-      let responseText: string;
+      const replyTimestamp = new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+      const showReply = (replyText: string) => {
+        usePlaygroundStore.setState({
+          chatMessages: [{ role: 'model', text: replyText, timestamp: replyTimestamp }],
+        });
+      };
 
       if (sessionId && backendIdx !== null) {
-        const res = await fetch(`/api/sessions/${sessionId}/chat`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({
+        let streamed = '';
+        const reply = await streamBackendChat(
+          sessionId,
+          {
             agent_index: backendIdx,
             message: "Hello! Please introduce yourself briefly and mention what you're currently working on.",
             history: [],
-          }),
-        });
-        if (!res.ok) throw new Error(`Chat API error: ${res.status}`);
-        const data = await res.json();
-        responseText = data.reply;
+          },
+          (delta) => {
+            streamed += delta;
+            showReply(streamed);
+          },
+        );
+        showReply(reply);
       } else {
         const systemInstruction = `You are ${agent.role} at the AI Design Studio.
 Department: ${agent.department}
@@ -503,23 +516,14 @@ Expertise: ${agent.expertise.join(', ')}
 
 Keep your responses extremely brief (1-2 short sentences max) and professional. Introduce yourself very briefly and ask how you can help.`;
 
-        responseText = await playgroundGemini.chat(
+        showReply(await playgroundGemini.chat(
           systemInstruction,
           [],
           "Hello! Please introduce yourself briefly."
-        );
+        ));
       }
 
-      const modelMessage: ChatMessage = {
-        role: 'model',
-        text: responseText,
-        timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
-      };
-
-      usePlaygroundStore.setState((s) => ({
-        chatMessages: [modelMessage],
-        isThinking: false
-      }));
+      usePlaygroundStore.setState({ isThinking: false });
 
       this.characters.fadeToAction('Wave');
       setTimeout(() => this.characters.fadeToAction('Idle'), 2000);